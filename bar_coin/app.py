@@ -3,13 +3,13 @@ Main Streamlit application for BAR-COIN.
 """
 
 import streamlit as st
-import time
 from datetime import datetime
 import logging
 
-from bar_coin.config.settings import STREAMLIT_CONFIG, COLORS, UI_CONFIG
+from bar_coin.config.settings import STREAMLIT_CONFIG, COLORS
 from bar_coin.components.auth import render_login_page, check_authentication, render_authentication_status
-from bar_coin.components.dashboard import render_dashboard, update_coin_counts
+from bar_coin.components.dashboard import render_dashboard, get_session_coin_statistics
+from bar_coin.components.styles import inject_css
 from bar_coin.hardware.coin_counter import coin_counter
 
 # Configure logging
@@ -28,54 +28,7 @@ def main():
     )
     
     # Custom CSS
-    st.markdown("""
-    <style>
-    .main {
-        background: linear-gradient(180deg, #f0f2f6 0%, #ffffff 100%);
-    }
-    .stButton > button {
-        background-color: #1E90FF;
-        color: white;
-        border-radius: 25px;
-        border: none;
-        padding: 10px 30px;
-        font-weight: bold;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        background-color: #4169E1;
-        transform: translateY(-2px);
-    }
-    .metric-container {
-        background: white;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        margin: 10px 0;
-    }
-    .status-indicator {
-        display: inline-block;
-        width: 12px;
-        height: 12px;
-        border-radius: 50%;
-        margin-right: 8px;
-    }
-    .status-connected { background-color: #32CD32; }
-    .status-disconnected { background-color: #FF6347; }
-    .status-connecting { background-color: #FFA500; }
-    
-    /* Mobile responsive */
-    @media (max-width: 768px) {
-        .stButton > button {
-            padding: 8px 20px;
-            font-size: 14px;
-        }
-        .metric-container {
-            padding: 15px;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("app")
     
     # Check authentication
     user = check_authentication()
@@ -88,7 +41,7 @@ def main():
         return
     
     # User is authenticated - show dashboard
-    render_authentication_status()
+    render_authentication_status(user)
     
     # Initialize hardware if not already done
     if 'hardware_initialized' not in st.session_state:
@@ -100,16 +53,7 @@ def main():
         except Exception as e:
             logger.error(f"Hardware initialization error: {e}")
     
-    # Auto-refresh for real-time updates
-    if st.session_state.get('hardware_connected', False):
-        # Update coin counts from hardware
-        update_coin_counts()
-        
-        # Auto-refresh every 100ms for real-time updates
-        time.sleep(UI_CONFIG["refresh_rate"] / 1000)
-        st.rerun()
-    
-    # Render main dashboard
+    # Render main dashboard (the real-time counter refreshes itself as a fragment)
     render_dashboard(user)
 
 def render_sidebar():
@@ -142,12 +86,11 @@ def render_sidebar():
         
         # Quick stats
         if 'coin_counts' in st.session_state:
-            total_coins = sum(st.session_state.coin_counts.values())
-            total_value = sum(denom * count for denom, count in st.session_state.coin_counts.items())
+            stats = get_session_coin_statistics()
             
             st.markdown("### Quick Stats")
-            st.metric("Total Coins", f"{total_coins:,}")
-            st.metric("Total Value", f"₱{total_value:,.2f}")
+            st.metric("Total Coins", stats['formatted_total_coins'])
+            st.metric("Total Value", stats['formatted_total_value'])
         
         # Settings
         st.markdown("### Settings")
@@ -4,77 +4,20 @@ Authentication component for BAR-COIN Streamlit application.
 
 import streamlit as st
 import bcrypt
+import time
 from typing import Optional, Dict, Any
 from datetime import datetime
 
-from bar_coin.utils.database import db
+from bar_coin.utils.database import get_db
 from bar_coin.utils.helpers import hash_password, verify_password, validate_username, validate_password, validate_email
-from bar_coin.config.settings import COLORS, FONTS
+from bar_coin.config.settings import COLORS, FONTS, APP_CONFIG
+from bar_coin.components.styles import inject_css
 
 def render_login_page() -> Optional[Dict[str, Any]]:
     """Render the login page and return user data if authenticated."""
     
     # Custom CSS for login page
-    st.markdown("""
-    <style>
-    .login-container {
-        background: linear-gradient(135deg, #1E90FF 0%, #4169E1 100%);
-        min-height: 100vh;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        padding: 20px;
-    }
-    .login-card {
-        background: white;
-        border-radius: 15px;
-        padding: 40px;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        text-align: center;
-        max-width: 400px;
-        width: 100%;
-    }
-    .logo {
-        font-size: 48px;
-        margin-bottom: 10px;
-    }
-    .brand-name {
-        font-size: 32px;
-        font-weight: bold;
-        color: #1E90FF;
-        margin-bottom: 5px;
-    }
-    .tagline {
-        color: #666;
-        margin-bottom: 30px;
-    }
-    .stButton > button {
-        background-color: #1E90FF;
-        color: white;
-        border-radius: 25px;
-        border: none;
-        padding: 12px 30px;
-        font-size: 16px;
-        font-weight: bold;
-        width: 100%;
-        margin: 10px 0;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        background-color: #4169E1;
-        transform: translateY(-2px);
-    }
-    .secondary-button {
-        background-color: transparent !important;
-        color: #1E90FF !important;
-        border: 2px solid #1E90FF !important;
-    }
-    .secondary-button:hover {
-        background-color: #1E90FF !important;
-        color: white !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("login")
     
     # Main container
     with st.container():
@@ -154,7 +97,7 @@ def handle_login(username: str, password: str) -> Optional[Dict[str, Any]]:
         return None
     
     # Get user from database
-    user = db.get_user_by_username(username)
+    user = get_db().get_user_by_username(username)
     
     if not user:
         st.error("Invalid username or password")
@@ -166,14 +109,15 @@ def handle_login(username: str, password: str) -> Optional[Dict[str, Any]]:
         return None
     
     # Update last login
-    db.update_last_login(user['id'])
+    get_db().update_last_login(user['id'])
     
     # Store user data in session state
     st.session_state.user = {
         'id': user['id'],
         'username': user['username'],
         'email': user['email'],
-        'login_time': datetime.now()
+        'login_time': datetime.now(),
+        'login_mono': time.monotonic()
     }
     
     st.success(f"Welcome back, {user['username']}!")
@@ -210,7 +154,7 @@ def handle_register(username: str, email: str, password: str, confirm_password:
         return None
     
     # Check if username already exists
-    existing_user = db.get_user_by_username(username)
+    existing_user = get_db().get_user_public(username)
     if existing_user:
         st.error("Username already exists")
         return None
@@ -218,7 +162,7 @@ def handle_register(username: str, email: str, password: str, confirm_password:
     try:
         # Hash password and create user
         password_hash = hash_password(password)
-        user_id = db.create_user(username, password_hash, email)
+        user_id = get_db().create_user_with_hash(username, password_hash, email)
         
         st.success("Registration successful! Please login.")
         st.session_state.show_register = False
@@ -236,8 +180,12 @@ def check_authentication() -> Optional[Dict[str, Any]]:
     
     user = st.session_state.user
     
-    # Check session timeout (1 hour)
-    if 'login_time' in user:
+    # Check session timeout (1 hour) against the monotonic clock set at login
+    if 'login_mono' in user:
+        if time.monotonic() - user['login_mono'] > APP_CONFIG["session_timeout"]:
+            logout()
+            return None
+    elif 'login_time' in user:
         login_time = user['login_time']
         if isinstance(login_time, str):
             login_time = datetime.fromisoformat(login_time)
@@ -274,9 +222,10 @@ def render_user_info(user: Dict[str, Any]):
         if st.button("Logout", type="secondary"):
             logout()
 
-def render_authentication_status():
-    """Render authentication status in sidebar."""
-    user = check_authentication()
+def render_authentication_status(user: Optional[Dict[str, Any]] = None):
+    """Render authentication status in sidebar (pass an already-checked user to skip re-checking)."""
+    if user is None:
+        user = check_authentication()
     
     if user:
         render_user_info(user)
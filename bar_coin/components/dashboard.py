@@ -5,24 +5,51 @@ Main dashboard component for BAR-COIN Streamlit application.
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 import pandas as pd
+import csv
+import io
+import functools
+from collections import Counter
 
 from bar_coin.hardware.coin_counter import coin_counter
-from bar_coin.utils.database import db
+from bar_coin.utils.database import get_db
 from bar_coin.utils.helpers import (
     calculate_total_value, calculate_total_coins, format_coin_counts,
     get_coin_statistics, format_duration, format_timestamp
 )
-from bar_coin.config.settings import PHILIPPINE_COINS, COLORS, UI_CONFIG
+from bar_coin.config.settings import PHILIPPINE_COINS, VALID_DENOMINATIONS, COLORS, UI_CONFIG, PERFORMANCE_CONFIG, format_peso, get_coin_name
+
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+SQLITE_DATE_FORMAT = "%Y-%m-%d"
+
+_ZERO_COUNTS = {denom: 0 for denom in PHILIPPINE_COINS}
+
+# st.plotly_chart serializes every figure through plotly.io.to_json on each render
+pio.json.config.default_engine = "orjson"
+
+@functools.lru_cache(maxsize=128)
+def _cached_coin_statistics(counts_key: Tuple[Tuple[float, int], ...]) -> Mapping[str, Any]:
+    """Compute coin statistics (plus display strings) for a hashable snapshot of coin counts."""
+    stats = get_coin_statistics(dict(counts_key))
+    stats['formatted_total_coins'] = f"{stats['total_coins']:,}"
+    # Every session shares the cached result, so hand out a read-only view
+    return MappingProxyType(stats)
+
+def get_session_coin_statistics() -> Mapping[str, Any]:
+    """Get statistics for the session's coin counts, reusing results while counts are unchanged."""
+    # coin_counts is always built in PHILIPPINE_COINS order, so items() is a stable key
+    return _cached_coin_statistics(tuple(st.session_state.coin_counts.items()))
 
 def render_dashboard(user: Dict[str, Any]):
     """Render the main dashboard."""
     
     # Initialize session state
     if 'coin_counts' not in st.session_state:
-        st.session_state.coin_counts = {denom: 0 for denom in PHILIPPINE_COINS.keys()}
+        st.session_state.coin_counts = _ZERO_COUNTS.copy()
     
     if 'current_session_id' not in st.session_state:
         st.session_state.current_session_id = None
@@ -41,7 +68,7 @@ def render_dashboard(user: Dict[str, Any]):
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        render_real_time_counter()
+        render_live_counter()
         render_coin_breakdown()
     
     with col2:
@@ -82,12 +109,23 @@ def render_hardware_controls():
             else:
                 st.error("Connection test failed")
 
+def render_live_counter():
+    """Render the real-time counter as a fragment that refreshes while hardware is connected."""
+    run_every = UI_CONFIG["refresh_rate"] / 1000 if st.session_state.get('hardware_connected', False) else None
+    st.fragment(_live_counter_fragment, run_every=run_every)()
+
+def _live_counter_fragment():
+    """Pull new hardware data and redraw only the counter metrics."""
+    if st.session_state.get('hardware_connected', False):
+        update_coin_counts()
+    render_real_time_counter()
+
 def render_real_time_counter():
     """Render real-time coin counter display."""
     st.markdown("### 📊 Real-time Counter")
     
     # Get current statistics
-    stats = get_coin_statistics(st.session_state.coin_counts)
+    stats = get_session_coin_statistics()
     
     # Main counter display
     col1, col2, col3 = st.columns(3)
@@ -95,7 +133,7 @@ def render_real_time_counter():
     with col1:
         st.metric(
             label="Total Coins",
-            value=f"{stats['total_coins']:,}",
+            value=stats['formatted_total_coins'],
             delta=None
         )
     
@@ -139,36 +177,40 @@ def render_real_time_counter():
         
         st.markdown(f"**Processing Speed:** {status} ({speed:.1f} coins/min)")
 
+@st.cache_data(max_entries=32)
+def _breakdown_artifacts(counts_key: Tuple[Tuple[float, int], ...]) -> Tuple[pd.DataFrame, Optional[go.Figure]]:
+    """Build the breakdown table and pie chart for a snapshot of coin counts."""
+    df = pd.DataFrame(format_coin_counts(dict(counts_key)))
+    
+    if df.empty:
+        return df, None
+    
+    table = df[['name', 'count', 'formatted_value']].rename(columns={
+        'name': 'Denomination',
+        'count': 'Count',
+        'formatted_value': 'Value'
+    })
+    
+    # Create pie chart
+    fig = px.pie(
+        df, 
+        values='value', 
+        names='name',
+        title="Coin Distribution by Value",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_layout(height=400)
+    return table, fig
+
 def render_coin_breakdown():
     """Render coin breakdown by denomination."""
     st.markdown("### 🪙 Coin Breakdown")
     
-    formatted_counts = format_coin_counts(st.session_state.coin_counts)
-    
-    # Create a DataFrame for display
-    df = pd.DataFrame(formatted_counts)
+    table, fig = _breakdown_artifacts(tuple(st.session_state.coin_counts.items()))
     
-    if not df.empty:
+    if fig is not None:
         # Display as a table
-        st.dataframe(
-            df[['name', 'count', 'formatted_value']].rename(columns={
-                'name': 'Denomination',
-                'count': 'Count',
-                'formatted_value': 'Value'
-            }),
-            use_container_width=True,
-            hide_index=True
-        )
-        
-        # Create pie chart
-        fig = px.pie(
-            df, 
-            values='value', 
-            names='name',
-            title="Coin Distribution by Value",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_layout(height=400)
+        st.dataframe(table, use_container_width=True, hide_index=True)
         st.plotly_chart(fig, use_container_width=True)
 
 def render_control_panel():
@@ -181,11 +223,12 @@ def render_control_panel():
         if st.button("▶️ Start", use_container_width=True, type="primary"):
             if not st.session_state.current_session_id:
                 # Create new session
-                session_id = db.create_session(st.session_state.user['id'])
+                session_id = get_db().create_session(st.session_state.user['id'])
                 st.session_state.current_session_id = session_id
                 st.session_state.session_start_time = datetime.now()
+                _invalidate_session_cache()
                 
-                if coin_counter.start_session(str(session_id)):
+                if coin_counter.start_session(session_id):
                     st.success("Session started!")
                 else:
                     st.error("Failed to start session")
@@ -202,14 +245,15 @@ def render_control_panel():
         if st.button("⏹️ Stop", use_container_width=True):
             if st.session_state.current_session_id:
                 # End session
-                stats = get_coin_statistics(st.session_state.coin_counts)
-                db.end_session(
+                stats = get_session_coin_statistics()
+                get_db().end_session(
                     st.session_state.current_session_id,
                     stats['total_value'],
                     stats['total_coins']
                 )
                 
                 coin_counter.end_session()
+                _invalidate_session_cache()
                 st.session_state.current_session_id = None
                 st.session_state.session_start_time = None
                 st.success("Session ended!")
@@ -218,7 +262,7 @@ def render_control_panel():
     
     with col4:
         if st.button("🔄 Reset", use_container_width=True):
-            st.session_state.coin_counts = {denom: 0 for denom in PHILIPPINE_COINS.keys()}
+            st.session_state.coin_counts = _ZERO_COUNTS.copy()
             coin_counter.reset_counters()
             st.success("Counters reset!")
     
@@ -269,63 +313,81 @@ def render_hardware_status():
     st.write(f"- Port: {info['port']}")
     st.write(f"- Baud Rate: {info['baud_rate']}")
 
+@st.cache_data(ttl=PERFORMANCE_CONFIG["stats_cache_ttl"])
+def _load_dashboard_bundle(user_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Load the last 10 sessions and 30 days of daily stats, cached across reruns."""
+    return get_db().get_dashboard_bundle(user_id, session_limit=10, days=30)
+
+@st.cache_data(ttl=PERFORMANCE_CONFIG["stats_cache_ttl"])
+def _build_session_figures(sessions: List[Dict[str, Any]]) -> Tuple[go.Figure, go.Figure]:
+    """Build the recent-session value and coin-count charts."""
+    # Create sessions DataFrame (SQLite CURRENT_TIMESTAMP text, parsed with a fixed format)
+    sessions_df = pd.DataFrame(sessions)
+    sessions_df['start_time'] = pd.to_datetime(sessions_df['start_time'], format=SQLITE_TIMESTAMP_FORMAT, cache=True)
+    
+    value_fig = px.line(
+        sessions_df.head(10),
+        x='start_time',
+        y='calculated_value',
+        title="Recent Sessions - Total Value",
+        labels={'calculated_value': 'Value (₱)', 'start_time': 'Session Start'}
+    )
+    coins_fig = px.bar(
+        sessions_df.head(10),
+        x='start_time',
+        y='calculated_coins',
+        title="Recent Sessions - Coin Count",
+        labels={'calculated_coins': 'Coins', 'start_time': 'Session Start'}
+    )
+    return value_fig, coins_fig
+
+@st.cache_data(ttl=PERFORMANCE_CONFIG["stats_cache_ttl"])
+def _build_daily_figure(daily_stats: List[Dict[str, Any]]) -> go.Figure:
+    """Build the daily total value chart."""
+    daily_df = pd.DataFrame(daily_stats)
+    daily_df['date'] = pd.to_datetime(daily_df['date'], format=SQLITE_DATE_FORMAT, cache=True)
+    
+    return px.area(
+        daily_df,
+        x='date',
+        y='total_value',
+        title="Daily Total Value (Last 30 Days)",
+        labels={'total_value': 'Value (₱)', 'date': 'Date'}
+    )
+
+def _invalidate_session_cache():
+    """Drop cached session data after a session starts or ends."""
+    _load_dashboard_bundle.clear()
+
 def render_statistics_section(user: Dict[str, Any]):
     """Render statistics and charts section."""
     st.markdown("### 📈 Statistics & Analytics")
     
     # Get user sessions
-    sessions = db.get_user_sessions(user['id'], limit=10)
+    sessions, daily_stats = _load_dashboard_bundle(user['id'])
     
     if sessions:
-        # Create sessions DataFrame
-        sessions_df = pd.DataFrame(sessions)
-        sessions_df['start_time'] = pd.to_datetime(sessions_df['start_time'])
-        sessions_df['end_time'] = pd.to_datetime(sessions_df['end_time'])
-        sessions_df['duration'] = (sessions_df['end_time'] - sessions_df['start_time']).dt.total_seconds() / 60
+        value_fig, coins_fig = _build_session_figures(sessions)
         
         # Recent sessions chart
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.line(
-                sessions_df.head(10),
-                x='start_time',
-                y='calculated_value',
-                title="Recent Sessions - Total Value",
-                labels={'calculated_value': 'Value (₱)', 'start_time': 'Session Start'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(value_fig, use_container_width=True)
         
         with col2:
-            fig = px.bar(
-                sessions_df.head(10),
-                x='start_time',
-                y='calculated_coins',
-                title="Recent Sessions - Coin Count",
-                labels={'calculated_coins': 'Coins', 'start_time': 'Session Start'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(coins_fig, use_container_width=True)
         
         # Daily statistics
-        daily_stats = db.get_daily_stats(user['id'], days=30)
         if daily_stats:
-            daily_df = pd.DataFrame(daily_stats)
-            daily_df['date'] = pd.to_datetime(daily_df['date'])
-            
-            fig = px.area(
-                daily_df,
-                x='date',
-                y='total_value',
-                title="Daily Total Value (Last 30 Days)",
-                labels={'total_value': 'Value (₱)', 'date': 'Date'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_build_daily_figure(daily_stats), use_container_width=True)
     
     else:
         st.info("No session data available. Start counting coins to see statistics!")
 
+@st.fragment
 def render_session_management(user: Dict[str, Any]):
-    """Render session management section."""
+    """Render session management section (export clicks rerun only this fragment)."""
     st.markdown("### 📋 Session Management")
     
     # Current session info
@@ -346,8 +408,8 @@ def render_session_management(user: Dict[str, Any]):
             if st.button("📄 Generate Report", use_container_width=True):
                 generate_session_report(st.session_state.current_session_id)
     
-    # Recent sessions
-    sessions = db.get_user_sessions(user['id'], limit=5)
+    # Recent sessions (newest five of the cached bundle)
+    sessions = _load_dashboard_bundle(user['id'])[0][:5]
     if sessions:
         st.markdown("**Recent Sessions:**")
         for session in sessions:
@@ -360,23 +422,20 @@ def render_session_management(user: Dict[str, Any]):
 def export_session_data(session_id: int):
     """Export session data to CSV."""
     try:
-        data = db.export_session_data(session_id)
+        data = get_db().export_session_data(session_id)
         
-        # Create CSV data
-        csv_data = []
-        for denomination, count in data['coin_counts'].items():
-            csv_data.append({
-                'Denomination': get_coin_name(denomination),
-                'Count': count,
-                'Value': denomination * count
-            })
-        
-        df = pd.DataFrame(csv_data)
-        csv = df.to_csv(index=False)
+        # Write CSV rows directly; no DataFrame needed for a handful of denominations
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Denomination', 'Count', 'Value'])
+        writer.writerows(
+            (get_coin_name(item['denomination']), item['count'], item['value'])
+            for item in data['coin_counts']
+        )
         
         st.download_button(
             label="📥 Download CSV",
-            data=csv,
+            data=buffer.getvalue(),
             file_name=f"session_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
@@ -387,7 +446,7 @@ def export_session_data(session_id: int):
 def generate_session_report(session_id: int):
     """Generate session report."""
     try:
-        data = db.export_session_data(session_id)
+        data = get_db().export_session_data(session_id)
         
         # Create report content
         report = f"""
@@ -414,21 +473,25 @@ def generate_session_report(session_id: int):
 def update_coin_counts():
     """Update coin counts from hardware data."""
     try:
-        data_queue = coin_counter.get_data_queue()
-        
-        while not data_queue.empty():
-            try:
-                data = data_queue.get_nowait()
-                if data and 'denomination' in data:
+        detected = Counter()
+        for data in coin_counter.drain_pending(1024):
+            if data and 'denomination' in data:
+                try:
                     denomination = float(data['denomination'])
-                    if denomination in PHILIPPINE_COINS:
-                        st.session_state.coin_counts[denomination] += 1
-                        
-                        # Update database if session is active
-                        if st.session_state.current_session_id:
-                            db.add_coin_count(st.session_state.current_session_id, denomination)
-            except:
-                continue
+                except (TypeError, ValueError):
+                    continue
+                if denomination in VALID_DENOMINATIONS:
+                    detected[denomination] += 1
+        
+        if not detected:
+            return
+        
+        for denomination, count in detected.items():
+            st.session_state.coin_counts[denomination] += count
+        
+        # Update database if session is active
+        if st.session_state.current_session_id:
+            get_db().add_coin_counts_bulk(st.session_state.current_session_id, detected.items())
                 
     except Exception as e:
         st.error(f"Error updating coin counts: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Stylesheet loading for BAR-COIN Streamlit components.
+"""
+
+import streamlit as st
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+@st.cache_resource
+def load_css(name: str) -> str:
+    """Read a stylesheet from the static directory once per process."""
+    css = (STATIC_DIR / f"{name}.css").read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+def inject_css(name: str):
+    """Inject a cached stylesheet into the current page."""
+    st.markdown(load_css(name), unsafe_allow_html=True)
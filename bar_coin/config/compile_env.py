@@ -0,0 +1,48 @@
+"""
+Compile the project's .env file into an importable Python module.
+
+Run ``python -m bar_coin.config.compile_env`` after editing ``.env``. The
+generated ``_env_compiled.py`` is byte-compiled by Python like any other
+module, so settings.py can skip parsing ``.env`` at every process start.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import dotenv_values
+
+CONFIG_DIR = Path(__file__).parent
+DEFAULT_ENV_FILE = CONFIG_DIR.parent.parent / ".env"
+DEFAULT_OUTPUT = CONFIG_DIR / "_env_compiled.py"
+
+HEADER = '"""Generated by ``python -m bar_coin.config.compile_env``; do not edit."""\n\n'
+
+
+def render_env_module(values: Dict[str, Optional[str]]) -> str:
+    """Render .env values as a module defining an ``ENV`` dict of string literals."""
+    lines = [HEADER, "ENV = {\n"]
+    for key, value in values.items():
+        if value is not None:
+            lines.append(f"    {key!r}: {value!r},\n")
+    lines.append("}\n")
+    return "".join(lines)
+
+
+def compile_env(env_file: Path = DEFAULT_ENV_FILE, output: Path = DEFAULT_OUTPUT) -> Path:
+    """Compile ``env_file`` into ``output`` and return the output path."""
+    output.write_text(render_env_module(dotenv_values(env_file)), encoding="utf-8")
+    return output
+
+
+def main() -> int:
+    """Command-line entry point."""
+    if not DEFAULT_ENV_FILE.exists():
+        print(f"✗ No .env file found at {DEFAULT_ENV_FILE}")
+        return 1
+    print(f"✓ Compiled {DEFAULT_ENV_FILE} -> {compile_env()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
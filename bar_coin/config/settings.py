@@ -2,13 +2,44 @@
 Configuration settings for BAR-COIN application.
 """
 
+import functools
 import os
 from pathlib import Path
-from typing import Dict, Any
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+
+# Load environment variables, preferring a .env compiled by
+# `python -m bar_coin.config.compile_env` over parsing the file
+try:
+    from bar_coin.config._env_compiled import ENV as _COMPILED_ENV
+except ImportError:
+    _COMPILED_ENV = {}
+    # Skip .env entirely when the process environment is already complete
+    if os.environ.get("BAR_COIN_SKIP_DOTENV") != "1":
+        from dotenv import load_dotenv
+        load_dotenv()
+
+# Snapshot of the environment keys used below; real environment variables win,
+# as they do with load_dotenv()
+_ENV = MappingProxyType({
+    key: os.environ.get(key, _COMPILED_ENV.get(key))
+    for key in ("DATABASE_URL", "DEBUG", "SERIAL_PORT", "BAUD_RATE", "MOCK_HARDWARE", "SECRET_KEY")
+})
+
+_BOOL_CACHE: Dict[str, bool] = {}
+
+
+def _env(name: str, default: str) -> str:
+    """Get a snapshotted environment value, falling back to a default."""
+    value = _ENV.get(name)
+    return default if value is None else value
+
+
+def _bool(name: str, default: str) -> bool:
+    """Parse a snapshotted environment flag as a boolean, once per key."""
+    if name not in _BOOL_CACHE:
+        _BOOL_CACHE[name] = _env(name, default).lower() == "true"
+    return _BOOL_CACHE[name]
 
 # Base directory
 BASE_DIR = Path(__file__).parent.parent.parent
@@ -25,6 +56,13 @@ PHILIPPINE_COINS = {
     20.00: {"name": "20 piso", "diameter": 30.0, "weight": 11.5, "material": "bi-metallic"}
 }
 
+# Coin table keyed on integer centavos, for lookups on parsed amounts
+_COINS_BY_CENTS = {int(round(denomination * 100)): coin for denomination, coin in PHILIPPINE_COINS.items()}
+
+# Exact denominations for fast membership tests; the table itself is read-only
+VALID_DENOMINATIONS = frozenset(PHILIPPINE_COINS)
+PHILIPPINE_COINS = MappingProxyType(PHILIPPINE_COINS)
+
 # Color scheme
 COLORS = {
     "PRIMARY_BLUE": "#1E90FF",
@@ -44,22 +82,22 @@ FONTS = {
 
 # Database configuration
 DATABASE_CONFIG = {
-    "url": os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/data/coins.db"),
-    "echo": os.getenv("DEBUG", "True").lower() == "true"
+    "url": _env("DATABASE_URL", f"sqlite:///{BASE_DIR}/data/coins.db"),
+    "echo": _bool("DEBUG", "True")
 }
 
 # Hardware configuration
 HARDWARE_CONFIG = {
-    "serial_port": os.getenv("SERIAL_PORT", "COM3"),
-    "baud_rate": int(os.getenv("BAUD_RATE", "9600")),
+    "serial_port": _env("SERIAL_PORT", "COM3"),
+    "baud_rate": int(_env("BAUD_RATE", "9600")),
     "timeout": 1,
-    "mock_mode": os.getenv("MOCK_HARDWARE", "True").lower() == "true"
+    "mock_mode": _bool("MOCK_HARDWARE", "True")
 }
 
 # Application settings
 APP_CONFIG = {
-    "debug": os.getenv("DEBUG", "True").lower() == "true",
-    "secret_key": os.getenv("SECRET_KEY", "bar-coin-secret-key-change-in-production"),
+    "debug": _bool("DEBUG", "True"),
+    "secret_key": _env("SECRET_KEY", "bar-coin-secret-key-change-in-production"),
     "session_timeout": 3600,  # 1 hour
     "max_upload_size": 10 * 1024 * 1024,  # 10MB
 }
@@ -107,36 +145,57 @@ SECURITY_CONFIG = {
 # Performance configuration
 PERFORMANCE_CONFIG = {
     "cache_ttl": 300,  # 5 minutes
+    "stats_cache_ttl": 60,  # 1 minute, bounds staleness of dashboard analytics
     "batch_size": 100,
     "max_connections": 10,
     "connection_timeout": 30
 }
 
-def get_config() -> Dict[str, Any]:
-    """Get all configuration settings as a dictionary."""
-    return {
-        "philippine_coins": PHILIPPINE_COINS,
-        "colors": COLORS,
-        "fonts": FONTS,
-        "database": DATABASE_CONFIG,
-        "hardware": HARDWARE_CONFIG,
-        "app": APP_CONFIG,
-        "streamlit": STREAMLIT_CONFIG,
-        "ui": UI_CONFIG,
-        "export": EXPORT_CONFIG,
-        "logging": LOGGING_CONFIG,
-        "security": SECURITY_CONFIG,
-        "performance": PERFORMANCE_CONFIG
-    }
-
+# Read-only view of all configuration sections, built once at import
+_CONFIG = MappingProxyType({
+    "philippine_coins": PHILIPPINE_COINS,
+    "colors": COLORS,
+    "fonts": FONTS,
+    "database": DATABASE_CONFIG,
+    "hardware": HARDWARE_CONFIG,
+    "app": APP_CONFIG,
+    "streamlit": STREAMLIT_CONFIG,
+    "ui": UI_CONFIG,
+    "export": EXPORT_CONFIG,
+    "logging": LOGGING_CONFIG,
+    "security": SECURITY_CONFIG,
+    "performance": PERFORMANCE_CONFIG
+})
+
+def get_config() -> Mapping[str, Any]:
+    """Get all configuration settings as a read-only mapping."""
+    return _CONFIG
+
+@functools.lru_cache(maxsize=2048)
 def format_peso(amount: float) -> str:
     """Format amount as Philippine Peso currency."""
     return f"₱{amount:,.2f}"
 
+def to_cents(amount: float) -> int:
+    """Convert a peso amount to integer centavos."""
+    return int(round(amount * 100))
+
+@functools.lru_cache(maxsize=256, typed=True)
 def get_coin_name(denomination: float) -> str:
     """Get the name of a coin denomination."""
-    return PHILIPPINE_COINS.get(denomination, {}).get("name", f"₱{denomination}")
+    try:
+        coin = _COINS_BY_CENTS.get(to_cents(denomination))
+    except (TypeError, ValueError, OverflowError):
+        coin = None
+    return coin["name"] if coin else f"₱{denomination}"
 
 def is_valid_denomination(denomination: float) -> bool:
     """Check if a denomination is valid for Philippine coins."""
-    return denomination in PHILIPPINE_COINS 
\ No newline at end of file
+    if denomination in VALID_DENOMINATIONS:
+        return True
+    try:
+        cents = to_cents(denomination)
+        # Absorb float noise such as 0.7 - 0.6 but not near misses like 0.251
+        return cents in _COINS_BY_CENTS and abs(denomination * 100 - cents) < 1e-9
+    except (TypeError, ValueError, OverflowError):
+        return False
@@ -7,45 +7,90 @@ import logging
 import threading
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Callable, Any
-from queue import Queue, Empty
+from typing import Dict, List, Optional, Callable, Any, Tuple
 
-from bar_coin.config.settings import HARDWARE_CONFIG, PHILIPPINE_COINS
+from bar_coin.config.settings import HARDWARE_CONFIG, PHILIPPINE_COINS, to_cents
 from bar_coin.utils.helpers import parse_serial_data, validate_hardware_message
-from bar_coin.hardware.serial_handler import SerialHandler
-from bar_coin.hardware.mock_hardware import MockHardware
+from bar_coin.hardware.event_queue import EventQueue
 
 logger = logging.getLogger(__name__)
 
+# Minimum interval between processing-speed updates in the reader thread
+STATS_INTERVAL_NS = 1_000_000_000
+
+def _accept_message(message: Dict[str, Any]) -> bool:
+    """Accept a message without further validation."""
+    return True
+
+def _compile_dispatch(callbacks: Tuple[Callable[[Dict[str, Any]], None], ...]) -> Callable[[Dict[str, Any]], None]:
+    """Build an event dispatcher specialized for a fixed set of callbacks."""
+    if not callbacks:
+        def dispatch(event: Dict[str, Any]):
+            pass
+    elif len(callbacks) == 1:
+        callback, = callbacks
+        
+        def dispatch(event: Dict[str, Any]):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error("Error in callback: %s", e)
+    else:
+        def dispatch(event: Dict[str, Any]):
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error("Error in callback: %s", e)
+    return dispatch
+
 class CoinCounter:
     """Main coin counter hardware interface."""
     
+    __slots__ = (
+        'mock_mode', 'is_running', 'is_connected', 'data_queue', 'callbacks',
+        '_dispatch', 'current_session_id', '_validate', 'hardware', 'stats',
+        '_read_thread', '_stop_event'
+    )
+    
     def __init__(self, mock_mode: Optional[bool] = None):
         """Initialize coin counter."""
         self.mock_mode = mock_mode if mock_mode is not None else HARDWARE_CONFIG["mock_mode"]
         self.is_running = False
         self.is_connected = False
-        self.data_queue = Queue()
-        self.callbacks = []
+        self.data_queue = EventQueue()
+        self.callbacks = ()  # replaced, never mutated, so readers need no snapshot
+        self._dispatch = _compile_dispatch(self.callbacks)
         self.current_session_id = None
         
+        # Mock messages come from a fixed schema that parse_serial_data already
+        # checks, so only real hardware input is revalidated
+        self._validate = _accept_message if self.mock_mode else validate_hardware_message
+        
         # Initialize hardware interface
+        # Backends are imported lazily so only the selected one is loaded
         if self.mock_mode:
+            from bar_coin.hardware.mock_hardware import MockHardware
             self.hardware = MockHardware()
             logger.info("Initialized in MOCK mode")
         else:
+            from bar_coin.hardware.serial_handler import SerialHandler
+            from bar_coin.utils.database import get_db
             self.hardware = SerialHandler(
                 port=HARDWARE_CONFIG["serial_port"],
                 baudrate=HARDWARE_CONFIG["baud_rate"],
-                timeout=HARDWARE_CONFIG["timeout"]
+                timeout=HARDWARE_CONFIG["timeout"],
+                # Resolved per batch so constructing the counter never opens the database
+                log_sink=lambda rows: get_db().add_hardware_logs_bulk(rows)
             )
             logger.info("Initialized in HARDWARE mode")
         
         # Statistics
         self.stats = {
             'total_coins_processed': 0,
-            'session_start_time': None,
+            'session_start_ns': None,  # time.monotonic_ns() at session start
             'last_coin_time': None,
+            'last_coin_ns': None,
             'processing_speed': 0.0,
             'errors': 0,
             'warnings': 0
@@ -53,7 +98,6 @@ class CoinCounter:
         
         # Threading
         self._read_thread = None
-        self._stats_thread = None
         self._stop_event = threading.Event()
     
     def connect(self) -> bool:
@@ -69,7 +113,7 @@ class CoinCounter:
                 logger.error("Failed to connect to hardware")
                 return False
         except Exception as e:
-            logger.error(f"Error connecting to hardware: {e}")
+            logger.error("Error connecting to hardware: %s", e)
             return False
     
     def disconnect(self):
@@ -81,61 +125,52 @@ class CoinCounter:
         if self._read_thread and self._read_thread.is_alive():
             self._read_thread.join(timeout=5)
         
-        if self._stats_thread and self._stats_thread.is_alive():
-            self._stats_thread.join(timeout=5)
-        
         self.hardware.disconnect()
         logger.info("Disconnected from hardware")
     
     def _start_threads(self):
-        """Start background threads."""
-        # Data reading thread
+        """Start the background reader thread."""
         self._read_thread = threading.Thread(target=self._read_data_loop, daemon=True)
         self._read_thread.start()
-        
-        # Statistics update thread
-        self._stats_thread = threading.Thread(target=self._update_stats_loop, daemon=True)
-        self._stats_thread.start()
     
     def _read_data_loop(self):
-        """Continuously read data from hardware."""
+        """Continuously read data from hardware, refreshing statistics about once a second."""
+        last_stats_ns = time.monotonic_ns()
         while self.is_running and not self._stop_event.is_set():
             try:
-                data = self.hardware.read_data()
+                # Block until data arrives so the thread parks while idle
+                data = self.hardware.read_data(timeout=0.5)
                 if data:
                     self._process_data(data)
-                time.sleep(0.01)  # 10ms delay
+                
+                now_ns = time.monotonic_ns()
+                if now_ns - last_stats_ns >= STATS_INTERVAL_NS:
+                    self._update_processing_speed()
+                    last_stats_ns = now_ns
             except Exception as e:
-                logger.error(f"Error in data reading loop: {e}")
+                logger.error("Error in data reading loop: %s", e)
                 self.stats['errors'] += 1
                 time.sleep(1)  # Wait before retrying
     
-    def _update_stats_loop(self):
-        """Update statistics periodically."""
-        while self.is_running and not self._stop_event.is_set():
-            try:
-                self._update_processing_speed()
-                time.sleep(1)  # Update every second
-            except Exception as e:
-                logger.error(f"Error in stats update loop: {e}")
-                time.sleep(5)
-    
     def _process_data(self, data: str):
         """Process incoming data from hardware."""
         try:
             # Parse the data
             parsed_data = parse_serial_data(data)
             if not parsed_data:
-                logger.warning(f"Invalid data received: {data}")
+                logger.warning("Invalid data received: %s", data)
                 self.stats['warnings'] += 1
                 return
             
             # Validate the message
-            if not validate_hardware_message(parsed_data):
-                logger.warning(f"Invalid hardware message: {parsed_data}")
+            if not self._validate(parsed_data):
+                logger.warning("Invalid hardware message: %s", parsed_data)
                 self.stats['warnings'] += 1
                 return
             
+            # Queue the canonical denomination so the UI counts what the stats count
+            parsed_data['denomination'] = to_cents(float(parsed_data['denomination'])) / 100
+            
             # Process coin detection
             if parsed_data['type'] == 'coin_detected':
                 self._handle_coin_detection(parsed_data)
@@ -144,54 +179,55 @@ class CoinCounter:
             self.data_queue.put(parsed_data)
             
         except Exception as e:
-            logger.error(f"Error processing data: {e}")
+            logger.error("Error processing data: %s", e)
             self.stats['errors'] += 1
     
     def _handle_coin_detection(self, data: Dict[str, Any]):
         """Handle coin detection event."""
-        denomination = float(data['denomination'])
-        timestamp = data.get('timestamp', datetime.now().isoformat())
+        # Normalize to the canonical denomination via centavos
+        denomination = to_cents(float(data['denomination'])) / 100
+        timestamp = data.get('timestamp') or datetime.now().isoformat()
         
         # Update statistics
         self.stats['total_coins_processed'] += 1
         self.stats['last_coin_time'] = timestamp
+        self.stats['last_coin_ns'] = time.monotonic_ns()
         
         # Log the detection
-        logger.info(f"Coin detected: ₱{denomination} at {timestamp}")
+        logger.info("Coin detected: ₱%s at %s", denomination, timestamp)
         
-        # Notify callbacks
-        for callback in self.callbacks:
-            try:
-                callback({
-                    'type': 'coin_detected',
-                    'denomination': denomination,
-                    'timestamp': timestamp,
-                    'session_id': self.current_session_id
-                })
-            except Exception as e:
-                logger.error(f"Error in callback: {e}")
+        # Notify callbacks with a single shared event
+        event = {
+            'type': 'coin_detected',
+            'denomination': denomination,
+            'timestamp': timestamp,
+            'session_id': self.current_session_id
+        }
+        self._dispatch(event)
     
     def _update_processing_speed(self):
         """Update processing speed calculation."""
-        if self.stats['session_start_time'] and self.stats['total_coins_processed'] > 0:
-            elapsed = datetime.now() - self.stats['session_start_time']
-            elapsed_minutes = elapsed.total_seconds() / 60
+        start_ns = self.stats['session_start_ns']
+        if start_ns is not None and self.stats['total_coins_processed'] > 0:
+            elapsed_minutes = (time.monotonic_ns() - start_ns) / 60e9
             
             if elapsed_minutes > 0:
                 self.stats['processing_speed'] = self.stats['total_coins_processed'] / elapsed_minutes
     
-    def start_session(self, session_id: str) -> bool:
+    def start_session(self, session_id: int) -> bool:
         """Start a new counting session."""
         if not self.is_connected:
             logger.error("Cannot start session: not connected to hardware")
             return False
         
         self.current_session_id = session_id
-        self.stats['session_start_time'] = datetime.now()
+        if not self.mock_mode:
+            self.hardware.session_id = session_id
+        self.stats['session_start_ns'] = time.monotonic_ns()
         self.stats['total_coins_processed'] = 0
         self.stats['processing_speed'] = 0.0
         
-        logger.info(f"Started new session: {session_id}")
+        logger.info("Started new session: %s", session_id)
         return True
     
     def end_session(self) -> Dict[str, Any]:
@@ -205,14 +241,15 @@ class CoinCounter:
             'warnings': self.stats['warnings']
         }
         
-        if self.stats['session_start_time']:
-            duration = datetime.now() - self.stats['session_start_time']
-            session_stats['duration'] = duration.total_seconds()
+        if self.stats['session_start_ns'] is not None:
+            session_stats['duration'] = (time.monotonic_ns() - self.stats['session_start_ns']) / 1e9
         
         self.current_session_id = None
-        self.stats['session_start_time'] = None
+        if not self.mock_mode:
+            self.hardware.session_id = None
+        self.stats['session_start_ns'] = None
         
-        logger.info(f"Ended session: {session_stats}")
+        logger.info("Ended session: %s", session_stats)
         return session_stats
     
     def get_status(self) -> Dict[str, Any]:
@@ -228,30 +265,35 @@ class CoinCounter:
     
     def add_callback(self, callback: Callable[[Dict[str, Any]], None]):
         """Add callback for coin detection events."""
-        self.callbacks.append(callback)
+        self.callbacks = self.callbacks + (callback,)
+        self._dispatch = _compile_dispatch(self.callbacks)
     
     def remove_callback(self, callback: Callable[[Dict[str, Any]], None]):
         """Remove callback."""
         if callback in self.callbacks:
-            self.callbacks.remove(callback)
+            callbacks = list(self.callbacks)
+            callbacks.remove(callback)
+            self.callbacks = tuple(callbacks)
+            self._dispatch = _compile_dispatch(self.callbacks)
     
-    def get_data_queue(self) -> Queue:
+    def get_data_queue(self) -> EventQueue:
         """Get the data queue for UI updates."""
         return self.data_queue
     
+    def drain_pending(self, max_items: int = 1024) -> List[Dict[str, Any]]:
+        """Remove and return up to max_items queued messages without blocking."""
+        return self.data_queue.drain(max_items)
+    
     def clear_data_queue(self):
         """Clear the data queue."""
-        while not self.data_queue.empty():
-            try:
-                self.data_queue.get_nowait()
-            except Empty:
-                break
+        self.data_queue.clear()
     
     def reset_counters(self):
         """Reset all counters and statistics."""
         self.stats['total_coins_processed'] = 0
-        self.stats['session_start_time'] = None
+        self.stats['session_start_ns'] = None
         self.stats['last_coin_time'] = None
+        self.stats['last_coin_ns'] = None
         self.stats['processing_speed'] = 0.0
         self.stats['errors'] = 0
         self.stats['warnings'] = 0
@@ -271,7 +313,7 @@ class CoinCounter:
         try:
             return self.hardware.test_connection()
         except Exception as e:
-            logger.error(f"Connection test failed: {e}")
+            logger.error("Connection test failed: %s", e)
             return False
     
     def get_hardware_info(self) -> Dict[str, Any]:
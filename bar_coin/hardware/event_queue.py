@@ -0,0 +1,81 @@
+"""
+Lightweight event queue for hardware data in BAR-COIN.
+"""
+
+import threading
+import time
+from collections import deque
+from queue import Empty
+from typing import Any, List, Optional
+
+
+class EventQueue:
+    """FIFO queue backed by a deque and a wakeup event.
+
+    deque appends and pops are atomic in CPython, so put() and the non-blocking
+    reads take no lock; the Event is only used to park a blocking get(). Meant
+    for a single consumer, and mirrors the subset of ``queue.Queue`` used by the
+    hardware layer (raising ``queue.Empty`` the same way).
+    """
+
+    __slots__ = ('_items', '_ready')
+
+    def __init__(self, maxlen: Optional[int] = None):
+        """Initialize queue; ``maxlen`` drops the oldest items when exceeded."""
+        self._items = deque(maxlen=maxlen)
+        self._ready = threading.Event()
+
+    def put(self, item: Any):
+        """Append an item and wake a waiting consumer."""
+        self._items.append(item)
+        self._ready.set()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove and return the oldest item, waiting for one if ``block``."""
+        try:
+            return self._items.popleft()
+        except IndexError:
+            if not block:
+                raise Empty
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._ready.clear()
+            # Re-check after clearing so a put() racing with clear() is not lost
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise Empty
+            if not self._ready.wait(remaining):
+                raise Empty
+
+    def get_nowait(self) -> Any:
+        """Remove and return the oldest item without waiting."""
+        return self.get(block=False)
+
+    def drain(self, max_items: int) -> List[Any]:
+        """Remove and return up to ``max_items`` queued items without waiting."""
+        items = []
+        popleft = self._items.popleft
+        while len(items) < max_items:
+            try:
+                items.append(popleft())
+            except IndexError:
+                break
+        return items
+
+    def clear(self):
+        """Discard all queued items in one operation."""
+        self._items.clear()
+
+    def qsize(self) -> int:
+        """Return the number of queued items."""
+        return len(self._items)
+
+    def empty(self) -> bool:
+        """Return True if no items are queued."""
+        return not self._items
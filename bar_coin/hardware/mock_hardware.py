@@ -2,24 +2,37 @@
 Mock hardware implementation for BAR-COIN testing and development.
 """
 
-import json
+import logging
 import random
 import time
 import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from queue import Queue
+from queue import Empty
+
+import orjson
 
 from bar_coin.config.settings import PHILIPPINE_COINS
+from bar_coin.hardware.event_queue import EventQueue
+
+logger = logging.getLogger(__name__)
+
+# Number of random denominations drawn at once for simulated coins
+DENOMINATION_PREFETCH = 256
 
 class MockHardware:
     """Mock hardware implementation for testing."""
     
+    __slots__ = (
+        'is_connected', 'is_running', 'data_queue', 'simulation_thread', 'stop_event',
+        'simulation_config', 'stats', 'denominations', '_denom_tuple', '_denom_pool'
+    )
+    
     def __init__(self):
         """Initialize mock hardware."""
         self.is_connected = False
         self.is_running = False
-        self.data_queue = Queue()
+        self.data_queue = EventQueue()
         self.simulation_thread = None
         self.stop_event = threading.Event()
         
@@ -44,13 +57,15 @@ class MockHardware:
         
         # Supported denominations
         self.denominations = list(PHILIPPINE_COINS.keys())
+        self._denom_tuple = tuple(self.denominations)
+        self._denom_pool: List[float] = []  # prefetched random draws
     
     def connect(self) -> bool:
         """Simulate hardware connection."""
         self.is_connected = True
         self.is_running = True
         self.stats['session_start'] = datetime.now()
-        print("Mock hardware connected successfully")
+        logger.info("Mock hardware connected successfully")
         return True
     
     def disconnect(self):
@@ -62,7 +77,7 @@ class MockHardware:
         if self.simulation_thread and self.simulation_thread.is_alive():
             self.simulation_thread.join(timeout=5)
         
-        print("Mock hardware disconnected")
+        logger.info("Mock hardware disconnected")
     
     def start_simulation(self):
         """Start coin simulation."""
@@ -71,7 +86,7 @@ class MockHardware:
         
         self.simulation_thread = threading.Thread(target=self._simulation_loop, daemon=True)
         self.simulation_thread.start()
-        print("Mock hardware simulation started")
+        logger.info("Mock hardware simulation started")
         return True
     
     def stop_simulation(self):
@@ -79,53 +94,63 @@ class MockHardware:
         self.stop_event.set()
         if self.simulation_thread and self.simulation_thread.is_alive():
             self.simulation_thread.join(timeout=5)
-        print("Mock hardware simulation stopped")
+        logger.info("Mock hardware simulation stopped")
     
     def _simulation_loop(self):
         """Main simulation loop."""
-        while self.is_running and not self.stop_event.is_set():
+        # Bind hot lookups once; cfg is read per event so configure_simulation()
+        # still takes effect while the loop runs
+        rand = random.random
+        uniform = random.uniform
+        sleep = time.sleep
+        cfg = self.simulation_config
+        stop_is_set = self.stop_event.is_set
+        simulate_error = self._simulate_error
+        simulate_jam = self._simulate_jam
+        simulate_coin = self._simulate_coin_detection
+        
+        while self.is_running and not stop_is_set():
             try:
                 # Simulate coin detection
-                if random.random() < self.simulation_config['error_rate']:
-                    self._simulate_error()
-                elif random.random() < self.simulation_config['jamming_rate']:
-                    self._simulate_jam()
+                if rand() < cfg['error_rate']:
+                    simulate_error()
+                elif rand() < cfg['jamming_rate']:
+                    simulate_jam()
                 else:
-                    self._simulate_coin_detection()
+                    simulate_coin()
                 
                 # Random delay between events
-                delay = random.uniform(
-                    self.simulation_config['min_delay'],
-                    self.simulation_config['max_delay']
-                )
-                time.sleep(delay)
+                sleep(uniform(cfg['min_delay'], cfg['max_delay']))
                 
             except Exception as e:
-                print(f"Error in simulation loop: {e}")
-                time.sleep(1)
+                logger.error("Error in simulation loop: %s", e)
+                sleep(1)
     
     def _simulate_coin_detection(self):
         """Simulate a coin detection event."""
-        # Randomly select denomination
-        denomination = random.choice(self.denominations)
+        # Randomly select denomination, refilling the prefetched draws in one call
+        if not self._denom_pool:
+            self._denom_pool = random.choices(self._denom_tuple, k=DENOMINATION_PREFETCH)
+        denomination = self._denom_pool.pop()
+        now = datetime.now()
         
         # Create coin detection message
         coin_data = {
             "type": "coin_detected",
             "denomination": denomination,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "sensor_id": random.randint(1, 4),
             "confidence": random.uniform(0.85, 0.99)
         }
         
         # Add to data queue
-        self.data_queue.put(json.dumps(coin_data))
+        self.data_queue.put(orjson.dumps(coin_data).decode())
         
         # Update statistics
         self.stats['coins_simulated'] += 1
-        self.stats['last_coin_time'] = datetime.now()
+        self.stats['last_coin_time'] = now
         
-        print(f"Mock coin detected: ₱{denomination}")
+        logger.info("Mock coin detected: ₱%s", denomination)
     
     def _simulate_error(self):
         """Simulate a hardware error."""
@@ -144,10 +169,10 @@ class MockHardware:
             "severity": random.choice(["low", "medium", "high"])
         }
         
-        self.data_queue.put(json.dumps(error_data))
+        self.data_queue.put(orjson.dumps(error_data).decode())
         self.stats['errors_simulated'] += 1
         
-        print(f"Mock error: {error_data['error_type']}")
+        logger.info("Mock error: %s", error_data['error_type'])
     
     def _simulate_jam(self):
         """Simulate a coin jam."""
@@ -158,19 +183,25 @@ class MockHardware:
             "severity": random.choice(["minor", "major", "critical"])
         }
         
-        self.data_queue.put(json.dumps(jam_data))
+        self.data_queue.put(orjson.dumps(jam_data).decode())
         self.stats['jams_simulated'] += 1
         
-        print(f"Mock jam detected: {jam_data['location']}")
+        logger.info("Mock jam detected: %s", jam_data['location'])
     
-    def read_data(self) -> Optional[str]:
-        """Read simulated data."""
+    def read_data(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Read simulated data, waiting up to ``timeout`` seconds if given."""
         if not self.is_connected:
             return None
         
+        # Idle non-blocking polls return without raising and catching Empty
+        if not timeout and self.data_queue.empty():
+            return None
+        
         try:
+            if timeout:
+                return self.data_queue.get(timeout=timeout)
             return self.data_queue.get_nowait()
-        except:
+        except Empty:
             return None
     
     def write_data(self, data: str) -> bool:
@@ -178,7 +209,7 @@ class MockHardware:
         if not self.is_connected:
             return False
         
-        print(f"Mock hardware received: {data}")
+        logger.info("Mock hardware received: %s", data)
         return True
     
     def send_command(self, command: str) -> bool:
@@ -186,7 +217,7 @@ class MockHardware:
         if not self.is_connected:
             return False
         
-        print(f"Mock hardware command: {command}")
+        logger.info("Mock hardware command: %s", command)
         
         # Handle specific commands
         if command.strip().upper() == "START":
@@ -207,7 +238,7 @@ class MockHardware:
                 "running": self.is_running,
                 "stats": self.stats
             }
-            self.data_queue.put(json.dumps(status_data))
+            self.data_queue.put(orjson.dumps(status_data).decode())
             return True
         
         return True
@@ -236,11 +267,11 @@ class MockHardware:
             'last_coin_time': None,
             'session_start': datetime.now()
         }
-        print("Mock hardware stats reset")
+        logger.info("Mock hardware stats reset")
     
     def emergency_stop(self):
         """Simulate emergency stop."""
-        print("Mock hardware emergency stop triggered")
+        logger.info("Mock hardware emergency stop triggered")
         self.stop_simulation()
         self.disconnect()
     
@@ -250,23 +281,49 @@ class MockHardware:
             if key in self.simulation_config:
                 self.simulation_config[key] = value
         
-        print(f"Mock hardware configuration updated: {kwargs}")
+        logger.info("Mock hardware configuration updated: %s", kwargs)
     
-    def simulate_batch(self, denominations: List[float], count: int = 1):
-        """Simulate a batch of specific coins."""
+    def simulate_batch(self, denominations: List[float], count: int = 1, delay: float = 0.1):
+        """Simulate a batch of specific coins.
+        
+        With ``delay=0`` the whole batch is enqueued at once, and each
+        denomination's message is encoded a single time and reused.
+        """
+        batch = [denomination for denomination in denominations if denomination in self.denominations]
+        if not batch:
+            return
+        
+        if not delay:
+            timestamp = datetime.now().isoformat()
+            encoded = {
+                denomination: orjson.dumps({
+                    "type": "coin_detected",
+                    "denomination": denomination,
+                    "timestamp": timestamp,
+                    "sensor_id": 1,
+                    "confidence": 0.95
+                }).decode()
+                for denomination in batch
+            }
+            put = self.data_queue.put
+            for _ in range(count):
+                for denomination in batch:
+                    put(encoded[denomination])
+            self.stats['coins_simulated'] += count * len(batch)
+            return
+        
         for _ in range(count):
-            for denomination in denominations:
-                if denomination in self.denominations:
-                    coin_data = {
-                        "type": "coin_detected",
-                        "denomination": denomination,
-                        "timestamp": datetime.now().isoformat(),
-                        "sensor_id": 1,
-                        "confidence": 0.95
-                    }
-                    self.data_queue.put(json.dumps(coin_data))
-                    self.stats['coins_simulated'] += 1
-                    time.sleep(0.1)  # Small delay between coins
+            for denomination in batch:
+                coin_data = {
+                    "type": "coin_detected",
+                    "denomination": denomination,
+                    "timestamp": datetime.now().isoformat(),
+                    "sensor_id": 1,
+                    "confidence": 0.95
+                }
+                self.data_queue.put(orjson.dumps(coin_data).decode())
+                self.stats['coins_simulated'] += 1
+                time.sleep(delay)  # Small delay between coins
     
     def get_simulation_info(self) -> Dict[str, Any]:
         """Get detailed simulation information."""
@@ -2,34 +2,281 @@
 Serial communication handler for BAR-COIN hardware integration.
 """
 
+import asyncio
 import serial
+from serial.tools import list_ports
 import logging
+import struct
+import sys
+import threading
 import time
-from typing import Optional, Dict, Any
-from datetime import datetime
+from queue import Empty
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from bar_coin.hardware.event_queue import EventQueue
 
 logger = logging.getLogger(__name__)
 
+# Buffered output is written once it reaches this many bytes
+TX_FLUSH_THRESHOLD = 64
+
+# How long an enumerated port list is reused, in seconds
+PORTS_CACHE_TTL = 2.0
+
+# Hardware log entries are handed to the log sink in batches of up to
+# LOG_BATCH_SIZE, collected over at most LOG_BATCH_INTERVAL seconds
+LOG_BATCH_SIZE = 128
+LOG_BATCH_INTERVAL = 0.05
+
+LogEntry = Tuple[Optional[int], str, str]
+
+# How long test_connection waits for the PONG reply
+PING_TIMEOUT = 0.5
+
+# Linux serial ioctls for the USB-serial latency timer (include/uapi/linux/serial.h)
+TIOCGSERIAL = 0x541E
+TIOCSSERIAL = 0x541F
+ASYNC_LOW_LATENCY = 0x2000
+# struct serial_struct; flags is the fifth int
+SERIAL_STRUCT_FORMAT = 'iiIiiiiiHcciHHPHIL'
+SERIAL_FLAGS_OFFSET = 16
+
+def set_low_latency(serial_conn) -> bool:
+    """Set ASYNC_LOW_LATENCY on an open Linux serial port.
+    
+    USB-serial adapters such as FTDI batch received bytes for up to 16ms by
+    default; low-latency mode hands them over after about 1ms. Returns False
+    when the platform or driver does not support it.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    
+    # fcntl only exists on POSIX platforms
+    import fcntl
+    
+    buf = bytearray(struct.calcsize(SERIAL_STRUCT_FORMAT))
+    try:
+        fd = serial_conn.fileno()
+        fcntl.ioctl(fd, TIOCGSERIAL, buf)
+        flags, = struct.unpack_from('i', buf, SERIAL_FLAGS_OFFSET)
+        if not flags & ASYNC_LOW_LATENCY:
+            struct.pack_into('i', buf, SERIAL_FLAGS_OFFSET, flags | ASYNC_LOW_LATENCY)
+            fcntl.ioctl(fd, TIOCSSERIAL, buf)
+    except (OSError, AttributeError, TypeError, ValueError) as e:
+        logger.debug("Could not enable low-latency mode: %s", e)
+        return False
+    return True
+
+# Receive buffer size; a power of two so positions wrap with a bitmask
+RX_BUFFER_SIZE = 4096
+
+class _RingBuffer:
+    """Fixed-size circular byte buffer that hands out complete lines.
+    
+    ``head`` and ``tail`` only ever grow and are wrapped with ``& mask`` when
+    indexing, so writes and reads never reallocate or shift stored bytes.
+    When a write does not fit, the oldest bytes are dropped.
+    """
+    
+    __slots__ = ('capacity', 'mask', '_buf', 'head', 'tail', '_scanned')
+    
+    def __init__(self, capacity: int = RX_BUFFER_SIZE):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self._buf = bytearray(capacity)
+        self.head = 0
+        self.tail = 0
+        # Position up to which the buffer is known to contain no newline
+        self._scanned = 0
+    
+    def __len__(self) -> int:
+        return self.tail - self.head
+    
+    def clear(self):
+        """Discard all buffered bytes."""
+        self.head = self.tail = self._scanned = 0
+    
+    def write(self, data: bytes):
+        """Append bytes, overwriting the oldest data if the buffer is full."""
+        view = memoryview(data)
+        if len(view) > self.capacity:
+            view = view[-self.capacity:]
+        size = len(view)
+        overflow = len(self) + size - self.capacity
+        if overflow > 0:
+            logger.warning("Serial receive buffer full, dropped %s bytes", overflow)
+            self.head += overflow
+            self._scanned = max(self._scanned, self.head)
+        
+        start = self.tail & self.mask
+        first = min(size, self.capacity - start)
+        self._buf[start:start + first] = view[:first]
+        if first < size:
+            self._buf[:size - first] = view[first:]
+        self.tail += size
+    
+    def readline(self) -> Optional[bytes]:
+        """Remove and return the next line without its newline, if complete."""
+        head = self.head
+        tail = self.tail
+        pos = self._scanned if self._scanned > head else head
+        start = pos & self.mask
+        # Search the contiguous run up to the end of storage, then the wrapped part
+        end = start + tail - pos
+        if end <= self.capacity:
+            found = self._buf.find(b'\n', start, end)
+            newline = found - start + pos if found >= 0 else -1
+        else:
+            found = self._buf.find(b'\n', start)
+            if found >= 0:
+                newline = found - start + pos
+            else:
+                found = self._buf.find(b'\n', 0, end - self.capacity)
+                newline = found + self.capacity - start + pos if found >= 0 else -1
+        if newline < 0:
+            self._scanned = tail
+            return None
+        
+        start = head & self.mask
+        end = newline & self.mask
+        if start <= end:
+            line = self._buf[start:end]
+        else:
+            line = self._buf[start:] + self._buf[:end]
+        self.head = self._scanned = newline + 1
+        return bytes(line)
+
+class _SerialProtocol(asyncio.Protocol):
+    """asyncio protocol that splits received bytes into lines for a SerialHandler."""
+    
+    def __init__(self, handler: 'SerialHandler'):
+        self.handler = handler
+        self.transport = None
+        self._buf = _RingBuffer()
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self.handler.is_connected = True
+    
+    def data_received(self, data: bytes):
+        self.handler.stats['bytes_received'] += len(data)
+        self._buf.write(data)
+        put = self.handler.line_queue.put_nowait
+        readline = self._buf.readline
+        while (raw := readline()) is not None:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line:
+                put(line)
+    
+    def connection_lost(self, exc):
+        self.handler.is_connected = False
+        if exc is not None:
+            self.handler.last_error = str(exc)
+            logger.error("Serial connection lost: %s", exc)
+
 class SerialHandler:
     """Handles serial communication with coin counting hardware."""
     
-    def __init__(self, port: str = "COM3", baudrate: int = 9600, timeout: int = 1):
-        """Initialize serial handler."""
+    def __init__(self, port: str = "COM3", baudrate: int = 9600, timeout: int = 1,
+                 low_latency: bool = True,
+                 log_sink: Optional[Callable[[List[LogEntry]], None]] = None):
+        """Initialize serial handler.
+        
+        ``log_sink`` receives batches of (session_id, event_type, message)
+        tuples, e.g. ``DatabaseManager.add_hardware_logs_bulk``.
+        """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.low_latency = low_latency
         self.serial_conn = None
         self.is_connected = False
         self.last_error = None
         
+        # Bytes read from the port that do not yet form a complete line
+        self._rx_buf = _RingBuffer()
+        
+        # Outgoing bytes coalesced into a single port write
+        self._tx_buf = bytearray()
+        self._tx_threshold = TX_FLUSH_THRESHOLD
+        
+        # Result of the last port enumeration and when it was taken
+        self._ports_cache: Optional[List[str]] = None
+        self._ports_cache_ts = 0.0
+        
+        # Set by open_async(); lines received on the event loop
+        self.line_queue: Optional[asyncio.Queue] = None
+        self._transport = None
+        
+        # Connection events queued for the log writer thread
+        self.session_id: Optional[int] = None
+        self._log_sink = log_sink
+        self._log_queue = EventQueue()
+        self._log_thread = None
+        # Serializes starting and stopping the writer, so the reader and UI
+        # threads can't each start one; EventQueue supports a single consumer
+        self._log_lock = threading.Lock()
+        
         # Connection statistics
         self.stats = {
             'bytes_received': 0,
             'bytes_sent': 0,
             'errors': 0,
-            'last_communication': None
+            'last_communication_ns': None
         }
     
+    def _log_event(self, event_type: str, message: str):
+        """Queue a hardware log entry for the batched log writer."""
+        if self._log_sink is None:
+            return
+        with self._log_lock:
+            self._log_queue.put((self.session_id, event_type, message))
+            if self._log_thread is None:
+                self._log_thread = threading.Thread(target=self._log_writer_loop, daemon=True)
+                self._log_thread.start()
+    
+    def _log_writer_loop(self):
+        """Hand queued log entries to the sink in batches until told to stop."""
+        get = self._log_queue.get
+        stop = False
+        while not stop:
+            entry = get()
+            if entry is None:
+                break
+            batch = [entry]
+            deadline = time.monotonic() + LOG_BATCH_INTERVAL
+            while len(batch) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = get(timeout=remaining)
+                except Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            
+            try:
+                self._log_sink(batch)
+            except Exception as e:
+                logger.error("Error writing hardware logs: %s", e)
+    
+    def flush_logs(self):
+        """Write any queued log entries and stop the log writer thread."""
+        # Held until the writer exits so no second writer starts while the
+        # stop sentinel is still queued
+        with self._log_lock:
+            thread = self._log_thread
+            if thread is None:
+                return
+            self._log_queue.put(None)
+            thread.join()
+            self._log_thread = None
+    
     def connect(self) -> bool:
         """Establish serial connection."""
         try:
@@ -45,20 +292,25 @@ class SerialHandler:
             if self.serial_conn.is_open:
                 self.is_connected = True
                 self.last_error = None
-                logger.info(f"Successfully connected to {self.port} at {self.baudrate} baud")
+                if self.low_latency:
+                    set_low_latency(self.serial_conn)
+                logger.info("Successfully connected to %s at %s baud", self.port, self.baudrate)
+                self._log_event("INFO", f"Connected to {self.port} at {self.baudrate} baud")
                 return True
             else:
                 self.last_error = "Serial port failed to open"
-                logger.error(f"Failed to open serial port {self.port}")
+                logger.error("Failed to open serial port %s", self.port)
                 return False
                 
         except serial.SerialException as e:
             self.last_error = str(e)
-            logger.error(f"Serial connection error: {e}")
+            logger.error("Serial connection error: %s", e)
+            self._log_event("ERROR", f"Serial connection error: {e}")
             return False
         except Exception as e:
             self.last_error = str(e)
-            logger.error(f"Unexpected error during connection: {e}")
+            logger.error("Unexpected error during connection: %s", e)
+            self._log_event("ERROR", f"Unexpected error during connection: {e}")
             return False
     
     def disconnect(self):
@@ -66,72 +318,149 @@ class SerialHandler:
         if self.serial_conn and self.serial_conn.is_open:
             try:
                 self.serial_conn.close()
-                logger.info(f"Disconnected from {self.port}")
+                logger.info("Disconnected from %s", self.port)
+                self._log_event("INFO", f"Disconnected from {self.port}")
             except Exception as e:
-                logger.error(f"Error during disconnect: {e}")
+                logger.error("Error during disconnect: %s", e)
         
         self.is_connected = False
         self.serial_conn = None
+        self._rx_buf.clear()
+        self._tx_buf.clear()
+        self.flush_logs()
+    
+    def _fill_buffer(self, timeout: Optional[float] = None):
+        """Drain all bytes waiting on the port into the receive buffer in bulk.
+        
+        With a ``timeout``, wait up to that many seconds for the first byte
+        when nothing is waiting.
+        """
+        conn = self.serial_conn
+        read = conn.read
+        waiting = conn.in_waiting
+        if waiting:
+            chunk = read(waiting)
+        elif timeout:
+            # Only this blocking read uses the port's read timeout, so it is left
+            # at the last value instead of restored; callers pass the same value
+            # each time, which keeps port reconfiguration off the per-read path
+            if conn.timeout != timeout:
+                conn.timeout = timeout
+            chunk = read(1)
+            if chunk:
+                waiting = self.serial_conn.in_waiting
+                if waiting:
+                    chunk += read(waiting)
+        else:
+            return
+        
+        if chunk:
+            # Count raw bytes off the wire, line terminators included
+            self.stats['bytes_received'] += len(chunk)
+            self._rx_buf.write(chunk)
     
-    def read_data(self) -> Optional[str]:
-        """Read data from serial port."""
+    def read_data(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Read the next line from the serial port.
+        
+        Pending bytes are read in one call rather than byte by byte. When
+        ``timeout`` is given and no line is buffered, block for up to that many
+        seconds until data arrives instead of returning immediately.
+        """
         if not self.is_connected or not self.serial_conn:
             return None
         
         try:
-            if self.serial_conn.in_waiting > 0:
-                data = self.serial_conn.readline().decode('utf-8').strip()
+            line = self._rx_buf.readline()
+            if line is None:
+                self._fill_buffer(timeout)
+                line = self._rx_buf.readline()
+            if line is not None:
+                data = line.decode('utf-8').strip()
                 if data:
-                    self.stats['bytes_received'] += len(data.encode('utf-8'))
-                    self.stats['last_communication'] = datetime.now()
+                    self.stats['last_communication_ns'] = time.monotonic_ns()
                     return data
         except serial.SerialException as e:
             self.stats['errors'] += 1
             self.last_error = str(e)
-            logger.error(f"Serial read error: {e}")
+            logger.error("Serial read error: %s", e)
+            self._log_event("ERROR", f"Serial read error: {e}")
         except UnicodeDecodeError as e:
             self.stats['errors'] += 1
             self.last_error = f"Unicode decode error: {e}"
-            logger.error(f"Unicode decode error: {e}")
+            logger.error("Unicode decode error: %s", e)
         except Exception as e:
             self.stats['errors'] += 1
             self.last_error = str(e)
-            logger.error(f"Unexpected error during read: {e}")
+            logger.error("Unexpected error during read: %s", e)
         
         return None
     
-    def write_data(self, data: str) -> bool:
-        """Write data to serial port."""
+    def write_data(self, data: str, flush: bool = False, defer: bool = False) -> bool:
+        """Write data to serial port.
+        
+        Returns once the bytes are handed to the OS; with ``flush`` also wait
+        until they have been transmitted. With ``defer`` the data is only
+        buffered, and is sent together with later writes once the buffer
+        reaches the threshold or flush() is called.
+        """
+        if not self.is_connected or not self.serial_conn:
+            return False
+        
+        self._tx_buf += data.encode('utf-8')
+        if not defer or flush or len(self._tx_buf) >= self._tx_threshold:
+            return self.flush(wait=flush)
+        return True
+    
+    def flush(self, wait: bool = False) -> bool:
+        """Send all buffered output in a single write.
+        
+        With ``wait``, block until the port has transmitted it.
+        """
+        if not self._tx_buf and not wait:
+            return True
         if not self.is_connected or not self.serial_conn:
             return False
         
         try:
-            encoded_data = data.encode('utf-8')
-            bytes_written = self.serial_conn.write(encoded_data)
-            self.serial_conn.flush()
-            
-            self.stats['bytes_sent'] += bytes_written
-            self.stats['last_communication'] = datetime.now()
-            
-            logger.debug(f"Sent {bytes_written} bytes: {data}")
+            if self._tx_buf:
+                payload = bytes(self._tx_buf)
+                self._tx_buf.clear()
+                bytes_written = self.serial_conn.write(payload)
+                
+                self.stats['bytes_sent'] += bytes_written
+                self.stats['last_communication_ns'] = time.monotonic_ns()
+                
+                logger.debug("Sent %s bytes: %s", bytes_written, payload)
+            if wait:
+                self.serial_conn.flush()
             return True
             
         except serial.SerialException as e:
             self.stats['errors'] += 1
             self.last_error = str(e)
-            logger.error(f"Serial write error: {e}")
+            logger.error("Serial write error: %s", e)
+            self._log_event("ERROR", f"Serial write error: {e}")
             return False
         except Exception as e:
             self.stats['errors'] += 1
             self.last_error = str(e)
-            logger.error(f"Unexpected error during write: {e}")
+            logger.error("Unexpected error during write: %s", e)
             return False
     
-    def send_command(self, command: str) -> bool:
-        """Send a command to the hardware."""
+    def send_command(self, command: str, flush: bool = False) -> bool:
+        """Send a command to the hardware; ``flush`` waits until it is transmitted."""
         if not command.endswith('\n'):
             command += '\n'
-        return self.write_data(command)
+        return self.write_data(command, flush=flush)
+    
+    def send_commands(self, commands: List[str], flush: bool = False) -> bool:
+        """Send several commands to the hardware in a single write."""
+        for command in commands:
+            if not command.endswith('\n'):
+                command += '\n'
+            if not self.write_data(command, defer=True):
+                return False
+        return self.flush(wait=flush)
     
     def test_connection(self) -> bool:
         """Test if the connection is working."""
@@ -141,14 +470,85 @@ class SerialHandler:
         try:
             # Send a ping command
             if self.send_command("PING"):
-                # Wait for response
-                time.sleep(0.1)
-                response = self.read_data()
+                # Block on the port until the reply arrives instead of sleeping
+                response = self.read_data(timeout=PING_TIMEOUT)
                 return response is not None and "PONG" in response
             return False
         except Exception as e:
-            logger.error(f"Connection test failed: {e}")
+            logger.error("Connection test failed: %s", e)
+            return False
+    
+    async def open_async(self) -> bool:
+        """Open the port on the running event loop via pyserial-asyncio-fast.
+        
+        Received lines are pushed to ``line_queue`` as the loop sees the port
+        become readable, so callers await read_line() instead of polling.
+        Requires the optional ``pyserial-asyncio-fast`` package.
+        """
+        try:
+            import serial_asyncio_fast
+        except ImportError:
+            self.last_error = "pyserial-asyncio-fast is not installed"
+            logger.error("Async serial requires pyserial-asyncio-fast")
+            return False
+        
+        self.line_queue = asyncio.Queue()
+        try:
+            self._transport, _ = await serial_asyncio_fast.create_serial_connection(
+                asyncio.get_running_loop(),
+                lambda: _SerialProtocol(self),
+                self.port,
+                baudrate=self.baudrate
+            )
+        except (serial.SerialException, OSError) as e:
+            self.last_error = str(e)
+            logger.error("Serial connection error: %s", e)
             return False
+        
+        self.last_error = None
+        logger.info("Opened %s at %s baud on the event loop", self.port, self.baudrate)
+        return True
+    
+    async def read_line(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Wait for the next line received by open_async()."""
+        if self.line_queue is None:
+            return None
+        try:
+            line = await asyncio.wait_for(self.line_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.stats['last_communication_ns'] = time.monotonic_ns()
+        return line
+    
+    async def read_lines(self):
+        """Yield lines received by open_async() as they arrive."""
+        while self._transport is not None and not self._transport.is_closing():
+            line = await self.read_line()
+            if line is not None:
+                yield line
+    
+    def write_async(self, data: str) -> bool:
+        """Queue data on the async transport, which writes eagerly when possible."""
+        if self._transport is None or self._transport.is_closing():
+            return False
+        payload = data.encode('utf-8')
+        self._transport.write(payload)
+        self.stats['bytes_sent'] += len(payload)
+        return True
+    
+    async def test_connection_async(self) -> bool:
+        """Ping the hardware over the async transport."""
+        if not self.write_async("PING\n"):
+            return False
+        response = await self.read_line(timeout=PING_TIMEOUT)
+        return response is not None and "PONG" in response
+    
+    def close_async(self):
+        """Close the async transport opened by open_async()."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self.is_connected = False
     
     def get_status(self) -> Dict[str, Any]:
         """Get current serial connection status."""
@@ -158,7 +558,8 @@ class SerialHandler:
             'baudrate': self.baudrate,
             'timeout': self.timeout,
             'last_error': self.last_error,
-            'stats': self.stats.copy()
+            'stats': self.stats.copy(),
+            'seconds_since_communication': self._seconds_since_communication()
         }
         
         if self.serial_conn:
@@ -171,13 +572,20 @@ class SerialHandler:
         
         return status
     
+    def _seconds_since_communication(self) -> Optional[float]:
+        """Seconds elapsed since data was last sent or received."""
+        last = self.stats['last_communication_ns']
+        if last is None:
+            return None
+        return (time.monotonic_ns() - last) / 1e9
+    
     def reset_stats(self):
         """Reset connection statistics."""
         self.stats = {
             'bytes_received': 0,
             'bytes_sent': 0,
             'errors': 0,
-            'last_communication': None
+            'last_communication_ns': None
         }
         self.last_error = None
     
@@ -187,21 +595,28 @@ class SerialHandler:
         try:
             if self.serial_conn and self.serial_conn.is_open:
                 # Send emergency stop command if supported
-                self.send_command("EMERGENCY_STOP")
-                time.sleep(0.1)
+                self.send_command("EMERGENCY_STOP", flush=True)
         except:
             pass
         finally:
             self.disconnect()
     
     def get_available_ports(self) -> list:
-        """Get list of available serial ports."""
+        """Get list of available serial ports.
+        
+        Enumeration walks the OS device tree, so the result is reused for
+        PORTS_CACHE_TTL seconds.
+        """
+        now = time.monotonic()
+        if self._ports_cache is not None and now - self._ports_cache_ts < PORTS_CACHE_TTL:
+            return list(self._ports_cache)
+        
         try:
-            import serial.tools.list_ports
-            ports = serial.tools.list_ports.comports()
-            return [port.device for port in ports]
+            self._ports_cache = [port.device for port in list_ports.comports()]
+            self._ports_cache_ts = now
+            return list(self._ports_cache)
         except Exception as e:
-            logger.error(f"Error getting available ports: {e}")
+            logger.error("Error getting available ports: %s", e)
             return []
     
     def change_port(self, new_port: str) -> bool:
@@ -226,9 +641,11 @@ class SerialHandler:
             try:
                 self.serial_conn.reset_input_buffer()
                 self.serial_conn.reset_output_buffer()
+                self._rx_buf.clear()
+                self._tx_buf.clear()
                 logger.debug("Flushed serial buffers")
             except Exception as e:
-                logger.error(f"Error flushing buffers: {e}")
+                logger.error("Error flushing buffers: %s", e)
     
     def get_connection_info(self) -> Dict[str, Any]:
         """Get detailed connection information."""
@@ -2,14 +2,68 @@
 Database operations for BAR-COIN application.
 """
 
+import atexit
 import sqlite3
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from contextlib import contextmanager
 
-from bar_coin.config.settings import DATABASE_CONFIG, BASE_DIR
+from bar_coin.config.settings import DATABASE_CONFIG, BASE_DIR, to_cents
+from bar_coin.utils.helpers import hash_password
+
+# Amounts are stored as integer centavos and converted to pesos only at the
+# API boundary, so totals are summed exactly
+
+# Current time as unix seconds. Inserts write it explicitly rather than relying
+# on the column default: tables created before the switch to epoch timestamps
+# still carry DEFAULT CURRENT_TIMESTAMP, which would store text
+_NOW_EPOCH_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+# Add to a session's running count for a denomination in a single statement;
+# relies on the unique (session_id, denomination_cents) index
+UPSERT_COIN_COUNT_SQL = f"""
+    INSERT INTO coin_counts (session_id, denomination_cents, count, value_cents, timestamp)
+    VALUES (?, ?, ?, ?, {_NOW_EPOCH_SQL})
+    ON CONFLICT (session_id, denomination_cents) DO UPDATE
+    SET count = count + excluded.count,
+        value_cents = denomination_cents * (count + excluded.count),
+        timestamp = {_NOW_EPOCH_SQL}
+"""
+
+GET_USER_BY_USERNAME_SQL = """
+    SELECT id, username, password_hash, email, last_login, is_active
+    FROM users WHERE username = ? AND is_active = 1
+"""
+
+GET_USER_PUBLIC_SQL = """
+    SELECT id, username, email, last_login
+    FROM users WHERE username = ? AND is_active = 1
+"""
+
+# Unordered; callers that present counts use get_session_counts_sorted
+GET_SESSION_COUNTS_SQL = """
+    SELECT denomination_cents, count FROM coin_counts
+    WHERE session_id = ?
+"""
+
+ADD_HARDWARE_LOG_SQL = f"""
+    INSERT INTO hardware_logs (session_id, event_type, message, timestamp)
+    VALUES (?, ?, ?, {_NOW_EPOCH_SQL})
+"""
+
+# Bumped whenever _migrate_schema gains a step; stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
+# Compiled statements kept per connection; comfortably above the number of
+# distinct statements issued so frequently used ones are never evicted
+STATEMENT_CACHE_SIZE = 256
+
+# Database path for a private in-memory database (used by the tests); it
+# lives as long as the manager's connection, so close() discards it
+MEMORY_DB_PATH = ":memory:"
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +86,18 @@ class DatabaseManager:
                 self.db_path = BASE_DIR / "data" / "coins.db"
         
         # Ensure data directory exists
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if str(self.db_path) != MEMORY_DB_PATH:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Single long-lived connection shared by all operations; the lock is
+        # re-entrant because some methods call others while holding it
+        self._conn = None
+        self._lock = threading.RLock()
+        # Nesting depth of transaction() blocks; operations defer their commit while > 0
+        self._transaction_depth = 0
+        # Set when an operation fails inside transaction(); the block then rolls back
+        self._transaction_failed = False
+        atexit.register(self.close)
         
         # Initialize database
         self._init_database()
@@ -62,7 +127,7 @@ class DatabaseManager:
                     user_id INTEGER NOT NULL,
                     start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     end_time TIMESTAMP,
-                    total_value DECIMAL(10,2) DEFAULT 0.00,
+                    total_value_cents INTEGER DEFAULT 0,
                     total_coins INTEGER DEFAULT 0,
                     status TEXT DEFAULT 'active',
                     FOREIGN KEY (user_id) REFERENCES users (id)
@@ -74,10 +139,10 @@ class DatabaseManager:
                 CREATE TABLE IF NOT EXISTS coin_counts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     session_id INTEGER NOT NULL,
-                    denomination DECIMAL(4,2) NOT NULL,
+                    denomination_cents INTEGER NOT NULL,
                     count INTEGER DEFAULT 0,
-                    value DECIMAL(10,2) DEFAULT 0.00,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    value_cents INTEGER DEFAULT 0,
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                     FOREIGN KEY (session_id) REFERENCES sessions (id)
                 )
             """)
@@ -89,48 +154,271 @@ class DatabaseManager:
                     session_id INTEGER,
                     event_type TEXT NOT NULL,
                     message TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                     FOREIGN KEY (session_id) REFERENCES sessions (id)
                 )
             """)
             
+            self._migrate_schema(cursor)
+            
+            self._create_coin_count_index(cursor)
+            
+            self._create_session_total_triggers(cursor)
+            
+            # Indexes for per-user session listings and hardware log lookups;
+            # coin_counts(session_id) lookups use the unique index's prefix
+            cursor.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_sessions_user_start
+                    ON sessions (user_id, start_time DESC);
+                CREATE INDEX IF NOT EXISTS idx_hardware_logs_session_timestamp
+                    ON hardware_logs (session_id, timestamp DESC);
+                CREATE INDEX IF NOT EXISTS idx_hardware_logs_timestamp
+                    ON hardware_logs (timestamp DESC);
+            """)
+            
+            # Gather planner statistics once, on first initialization
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                cursor.execute("ANALYZE")
+            
             conn.commit()
             logger.info("Database initialized successfully")
     
+    def _migrate_schema(self, cursor: sqlite3.Cursor):
+        """Upgrade data written by older versions, up to SCHEMA_VERSION."""
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        # Every step and the version bump share one transaction, so an upgrade
+        # that fails part-way leaves the database exactly as it was
+        cursor.execute("BEGIN")
+        
+        if version < 3:
+            # coin_counts and hardware_logs timestamps moved from text to unix seconds
+            # (v1). Repeated at v3 for text rows that upgraded databases went on
+            # writing through their old DEFAULT CURRENT_TIMESTAMP columns
+            for table in ("coin_counts", "hardware_logs"):
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+                    WHERE typeof(timestamp) = 'text'
+                """)
+        
+        if version < 2:
+            cursor.execute("SELECT 1 FROM pragma_table_info('coin_counts') WHERE name = 'denomination'")
+            if cursor.fetchone() is not None:
+                self._migrate_amounts_to_cents(cursor)
+        
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        cursor.connection.commit()
+    
+    def _migrate_amounts_to_cents(self, cursor: sqlite3.Cursor):
+        """Convert peso amount columns to integer centavos, keeping stored totals."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_coin_counts_insert'")
+        had_triggers = cursor.fetchone() is not None
+        # Rescaling must not be replayed onto the session totals by the triggers.
+        # Run one statement at a time: executescript() would COMMIT the caller's
+        # migration transaction first
+        for statement in (
+            "DROP TRIGGER IF EXISTS trg_coin_counts_insert",
+            "DROP TRIGGER IF EXISTS trg_coin_counts_update",
+            "DROP TRIGGER IF EXISTS trg_coin_counts_delete",
+            "ALTER TABLE coin_counts RENAME COLUMN denomination TO denomination_cents",
+            "ALTER TABLE coin_counts RENAME COLUMN value TO value_cents",
+            "ALTER TABLE sessions RENAME COLUMN total_value TO total_value_cents",
+        ):
+            cursor.execute(statement)
+        cursor.execute("""
+            UPDATE coin_counts
+            SET denomination_cents = CAST(round(denomination_cents * 100) AS INTEGER),
+                value_cents = CAST(round(value_cents * 100) AS INTEGER)
+        """)
+        cursor.execute("""
+            UPDATE sessions
+            SET total_value_cents = CAST(round(total_value_cents * 100) AS INTEGER)
+        """)
+        if had_triggers:
+            self._create_session_total_triggers(cursor, resync=False)
+    
+    def _create_session_total_triggers(self, cursor: sqlite3.Cursor, resync: bool = True):
+        """Create triggers that keep sessions.total_value_cents/total_coins in step with coin_counts."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_coin_counts_insert'")
+        if resync and cursor.fetchone() is None:
+            # First run with triggers: bring stored totals in line with existing counts
+            cursor.execute("""
+                UPDATE sessions
+                SET total_value_cents = COALESCE((SELECT SUM(value_cents) FROM coin_counts WHERE session_id = sessions.id), 0),
+                    total_coins = COALESCE((SELECT SUM(count) FROM coin_counts WHERE session_id = sessions.id), 0)
+            """)
+        
+        # Separate execute() calls so the migration can create these inside its
+        # transaction; executescript() would commit it first
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_coin_counts_insert
+            AFTER INSERT ON coin_counts
+            BEGIN
+                UPDATE sessions
+                SET total_value_cents = total_value_cents + NEW.value_cents,
+                    total_coins = total_coins + NEW.count
+                WHERE id = NEW.session_id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_coin_counts_update
+            AFTER UPDATE OF session_id, count, value_cents ON coin_counts
+            BEGIN
+                UPDATE sessions
+                SET total_value_cents = total_value_cents - OLD.value_cents,
+                    total_coins = total_coins - OLD.count
+                WHERE id = OLD.session_id;
+                UPDATE sessions
+                SET total_value_cents = total_value_cents + NEW.value_cents,
+                    total_coins = total_coins + NEW.count
+                WHERE id = NEW.session_id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_coin_counts_delete
+            AFTER DELETE ON coin_counts
+            BEGIN
+                UPDATE sessions
+                SET total_value_cents = total_value_cents - OLD.value_cents,
+                    total_coins = total_coins - OLD.count
+                WHERE id = OLD.session_id;
+            END
+        """)
+    
+    def _create_coin_count_index(self, cursor: sqlite3.Cursor):
+        """Create the unique (session_id, denomination_cents) index used by the coin count upsert."""
+        create_index = """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_coin_counts_session_denomination
+            ON coin_counts (session_id, denomination_cents)
+        """
+        try:
+            cursor.execute(create_index)
+        except sqlite3.IntegrityError:
+            # Older databases may hold duplicate rows; merge them into the first row
+            logger.warning("Merging duplicate coin count rows before indexing")
+            cursor.execute("""
+                UPDATE coin_counts
+                SET count = (SELECT SUM(c.count) FROM coin_counts c
+                             WHERE c.session_id = coin_counts.session_id
+                             AND c.denomination_cents = coin_counts.denomination_cents),
+                    value_cents = (SELECT SUM(c.value_cents) FROM coin_counts c
+                                   WHERE c.session_id = coin_counts.session_id
+                                   AND c.denomination_cents = coin_counts.denomination_cents)
+                WHERE id IN (SELECT MIN(id) FROM coin_counts GROUP BY session_id, denomination_cents)
+            """)
+            cursor.execute("""
+                DELETE FROM coin_counts
+                WHERE id NOT IN (SELECT MIN(id) FROM coin_counts GROUP BY session_id, denomination_cents)
+            """)
+            cursor.execute(create_index)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared connection and apply per-connection pragmas."""
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+            PRAGMA foreign_keys=ON;
+        """)
+        return conn
+    
     @contextmanager
     def _get_connection(self):
-        """Get database connection with context manager."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Get the shared database connection, held under the manager lock."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            conn = self._conn
+            try:
+                yield conn
+            except BaseException:
+                if self._transaction_depth:
+                    # Inside transaction(), which owns the rollback; rolling back
+                    # here would discard the block's earlier writes but let any
+                    # later ones commit
+                    self._transaction_failed = True
+                elif conn.in_transaction:
+                    # Don't leave a half-finished transaction on the shared connection
+                    conn.rollback()
+                raise
+    
+    @contextmanager
+    def transaction(self):
+        """Group several operations into a single, all-or-nothing commit.
+        
+        Operations inside the block skip their own commit and the whole block
+        is committed once on exit. If any operation fails, nothing is
+        committed: an error leaving the block rolls it back, and if the caller
+        catches the error instead, the block is rolled back on exit and
+        ``sqlite3.OperationalError`` is raised. Nested blocks join the
+        outermost one. The manager lock is held throughout, so other threads
+        wait rather than interleaving writes.
+        """
+        with self._get_connection() as conn:
+            if not self._transaction_depth:
+                self._transaction_failed = False
+            self._transaction_depth += 1
+            try:
+                yield conn
+            finally:
+                self._transaction_depth -= 1
+            if not self._transaction_depth:
+                if self._transaction_failed:
+                    # Raised at depth 0, so _get_connection rolls the block back
+                    raise sqlite3.OperationalError(
+                        "transaction rolled back: an operation inside it failed")
+                conn.commit()
+    
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit unless inside a transaction() block, which commits on exit."""
+        if not self._transaction_depth:
+            conn.commit()
+    
+    def close(self):
+        """Close the shared connection, if open; it is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
     
     def create_user(self, username: str, password: str, email: Optional[str] = None) -> int:
         """Create a new user."""
-        from bar_coin.utils.helpers import hash_password
-        password_hash = hash_password(password)
-        
+        return self.create_user_with_hash(username, hash_password(password), email)
+    
+    def create_user_with_hash(self, username: str, password_hash: str, email: Optional[str] = None) -> int:
+        """Create a new user from an already computed bcrypt password hash."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO users (username, password_hash, email)
                 VALUES (?, ?, ?)
             """, (username, password_hash, email))
-            conn.commit()
+            self._commit(conn)
             return cursor.lastrowid
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM users WHERE username = ? AND is_active = 1
-            """, (username,))
+            cursor.execute(GET_USER_BY_USERNAME_SQL, (username,))
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def get_user_public(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get an active user by username without the password hash."""
+        with self._get_connection() as conn:
+            row = conn.execute(GET_USER_PUBLIC_SQL, (username,)).fetchone()
+            return dict(row) if row else None
+    
     def update_last_login(self, user_id: int):
         """Update user's last login timestamp."""
         with self._get_connection() as conn:
@@ -139,7 +427,7 @@ class DatabaseManager:
                 UPDATE users SET last_login = CURRENT_TIMESTAMP
                 WHERE id = ?
             """, (user_id,))
-            conn.commit()
+            self._commit(conn)
     
     def create_session(self, user_id: int, session_name: str = None) -> int:
         """Create a new counting session."""
@@ -149,77 +437,55 @@ class DatabaseManager:
                 INSERT INTO sessions (user_id, start_time, status)
                 VALUES (?, CURRENT_TIMESTAMP, 'active')
             """, (user_id,))
-            conn.commit()
+            self._commit(conn)
             return cursor.lastrowid
     
     def end_session(self, session_id: int, total_value: float = None, total_coins: int = None):
-        """End a counting session."""
+        """End a counting session.
+        
+        Totals are kept up to date by the coin_counts triggers; pass values only
+        to override them.
+        """
+        total_value_cents = None if total_value is None else to_cents(total_value)
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # If values not provided, calculate from coin counts
-            if total_value is None or total_coins is None:
-                counts = self.get_session_counts(session_id)
-                if total_coins is None:
-                    total_coins = sum(counts.values())
-                if total_value is None:
-                    total_value = sum(denomination * count for denomination, count in counts.items())
-            
-            cursor.execute("""
+            conn.execute("""
                 UPDATE sessions 
                 SET end_time = CURRENT_TIMESTAMP,
-                    total_value = ?,
-                    total_coins = ?,
+                    total_value_cents = COALESCE(?, total_value_cents),
+                    total_coins = COALESCE(?, total_coins),
                     status = 'completed'
                 WHERE id = ?
-            """, (total_value, total_coins, session_id))
-            conn.commit()
+            """, (total_value_cents, total_coins, session_id))
+            self._commit(conn)
     
     def add_coin_count(self, session_id: int, denomination: float, count: int = 1):
         """Add coin count to session."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if denomination already exists for this session
-            cursor.execute("""
-                SELECT id, count FROM coin_counts 
-                WHERE session_id = ? AND denomination = ?
-            """, (session_id, denomination))
-            
-            existing = cursor.fetchone()
-            if existing:
-                # Update existing count
-                new_count = existing['count'] + count
-                value = denomination * new_count
-                cursor.execute("""
-                    UPDATE coin_counts 
-                    SET count = ?, value = ?, timestamp = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (new_count, value, existing['id']))
-            else:
-                # Insert new denomination
-                value = denomination * count
-                cursor.execute("""
-                    INSERT INTO coin_counts (session_id, denomination, count, value)
-                    VALUES (?, ?, ?, ?)
-                """, (session_id, denomination, count, value))
-            
-            conn.commit()
+            cents = to_cents(denomination)
+            conn.execute(UPSERT_COIN_COUNT_SQL, (session_id, cents, count, cents * count))
+            self._commit(conn)
+    
+    def add_coin_counts_bulk(self, session_id: int, counts: Iterable[Tuple[float, int]]):
+        """Add several (denomination, count) pairs to a session in one transaction."""
+        rows = []
+        for denomination, count in counts:
+            cents = to_cents(denomination)
+            rows.append((session_id, cents, count, cents * count))
+        with self._get_connection() as conn:
+            conn.executemany(UPSERT_COIN_COUNT_SQL, rows)
+            self._commit(conn)
     
     def get_session_counts(self, session_id: int) -> Dict[float, int]:
         """Get coin counts for a session."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT denomination, count FROM coin_counts
-                WHERE session_id = ?
-                ORDER BY denomination
-            """, (session_id,))
-            
-            counts = {}
-            for row in cursor.fetchall():
-                counts[row['denomination']] = row['count']
-            return counts
+            cursor.row_factory = None
+            cursor.execute(GET_SESSION_COUNTS_SQL, (session_id,))
+            return {cents / 100: count for cents, count in cursor}
+    
+    def get_session_counts_sorted(self, session_id: int) -> Dict[float, int]:
+        """Get coin counts for a session ordered by denomination."""
+        return dict(sorted(self.get_session_counts(session_id).items()))
     
     def get_session_summary(self, session_id: int) -> Dict[str, Any]:
         """Get session summary."""
@@ -227,70 +493,90 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT s.*, u.username,
-                       (SELECT SUM(value) FROM coin_counts WHERE session_id = s.id) as calculated_value,
-                       (SELECT SUM(count) FROM coin_counts WHERE session_id = s.id) as calculated_coins
+                       s.total_value_cents / 100.0 as total_value,
+                       s.total_value_cents / 100.0 as calculated_value,
+                       s.total_coins as calculated_coins
                 FROM sessions s
                 JOIN users u ON s.user_id = u.id
                 WHERE s.id = ?
             """, (session_id,))
             
             row = cursor.fetchone()
-            if row:
-                summary = dict(row)
-                # Use calculated values if available, otherwise use stored values
-                summary['total_value'] = summary.get('calculated_value', 0) or summary.get('total_value', 0)
-                summary['total_coins'] = summary.get('calculated_coins', 0) or summary.get('total_coins', 0)
-                return summary
-            return {}
+            return dict(row) if row else {}
     
     def get_user_sessions(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
         """Get user's recent sessions."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.*, 
-                       (SELECT SUM(value) FROM coin_counts WHERE session_id = s.id) as calculated_value,
-                       (SELECT SUM(count) FROM coin_counts WHERE session_id = s.id) as calculated_coins
-                FROM sessions s
-                WHERE s.user_id = ?
-                ORDER BY s.start_time DESC
-                LIMIT ?
-            """, (user_id, limit))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            return self._query_user_sessions(conn.cursor(), user_id, limit)
     
     def get_daily_stats(self, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
         """Get daily statistics for user."""
+        with self._get_connection() as conn:
+            return self._query_daily_stats(conn.cursor(), user_id, days)
+    
+    def get_dashboard_bundle(self, user_id: int, session_limit: int = 10,
+                             days: int = 30) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get recent sessions and daily statistics for the dashboard over one connection."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    DATE(s.start_time) as date,
-                    COUNT(s.id) as sessions,
-                    SUM(s.total_value) as total_value,
-                    SUM(s.total_coins) as total_coins
-                FROM sessions s
-                WHERE s.user_id = ? 
-                AND s.start_time >= DATE('now', '-{} days')
-                GROUP BY DATE(s.start_time)
-                ORDER BY date DESC
-            """.format(days), (user_id,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            sessions = self._query_user_sessions(cursor, user_id, session_limit)
+            daily_stats = self._query_daily_stats(cursor, user_id, days)
+            return sessions, daily_stats
+    
+    def _query_user_sessions(self, cursor: sqlite3.Cursor, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch a user's recent sessions using an open cursor."""
+        cursor.execute("""
+            SELECT s.*,
+                   s.total_value_cents / 100.0 as total_value,
+                   s.total_value_cents / 100.0 as calculated_value,
+                   s.total_coins as calculated_coins
+            FROM sessions s
+            WHERE s.user_id = ?
+            ORDER BY s.start_time DESC
+            LIMIT ?
+        """, (user_id, limit))
+        
+        # Dicts rather than Rows: the dashboard caches these with st.cache_data,
+        # which pickles its results
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def _query_daily_stats(self, cursor: sqlite3.Cursor, user_id: int, days: int) -> List[Dict[str, Any]]:
+        """Fetch a user's daily statistics using an open cursor."""
+        cursor.execute("""
+            SELECT 
+                DATE(s.start_time) as date,
+                COUNT(s.id) as sessions,
+                SUM(s.total_value_cents) / 100.0 as total_value,
+                SUM(s.total_coins) as total_coins
+            FROM sessions s
+            WHERE s.user_id = ? 
+            AND s.start_time >= DATE('now', ?)
+            GROUP BY DATE(s.start_time)
+            ORDER BY date DESC
+        """, (user_id, f"-{int(days)} days"))
+        
+        return [dict(row) for row in cursor.fetchall()]
     
     def add_hardware_log(self, session_id: Optional[int], event_type: str, message: str) -> int:
         """Add hardware log entry."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO hardware_logs (session_id, event_type, message, timestamp)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            """, (session_id, event_type, message))
-            conn.commit()
+            cursor.execute(ADD_HARDWARE_LOG_SQL, (session_id, event_type, message))
+            self._commit(conn)
             return cursor.lastrowid
     
-    def get_hardware_logs(self, session_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get hardware logs."""
+    def add_hardware_logs_bulk(self, entries: Iterable[Tuple[Optional[int], str, str]]):
+        """Add several (session_id, event_type, message) log entries in one transaction."""
+        with self._get_connection() as conn:
+            conn.executemany(ADD_HARDWARE_LOG_SQL, entries)
+            self._commit(conn)
+    
+    def get_hardware_logs(self, session_id: Optional[int] = None, limit: int = 100) -> List[sqlite3.Row]:
+        """Get hardware logs, newest first.
+        
+        Rows are returned as read-only ``sqlite3.Row`` objects; convert with
+        ``dict(row)`` where a mutable or picklable mapping is needed.
+        """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             if session_id:
@@ -307,13 +593,16 @@ class DatabaseManager:
                     LIMIT ?
                 """, (limit,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
     
     def export_session_data(self, session_id: int) -> Dict[str, Any]:
         """Export session data for CSV/PDF generation."""
         session_summary = self.get_session_summary(session_id)
-        coin_counts = self.get_session_counts(session_id)
-        hardware_logs = self.get_hardware_logs(session_id)
+        coin_counts = self.get_session_counts_sorted(session_id)
+        hardware_logs = [
+            dict(log, timestamp=format_epoch(log['timestamp']))
+            for log in self.get_hardware_logs(session_id)
+        ]
         
         # Convert coin_counts dict to list format for export
         coin_counts_list = []
@@ -338,5 +627,22 @@ class DatabaseManager:
             "hardware_logs": hardware_logs
         }
 
-# Global database instance
-db = DatabaseManager() 
\ No newline at end of file
+def format_epoch(seconds: Optional[int]) -> Optional[str]:
+    """Render a stored unix timestamp in SQLite's CURRENT_TIMESTAMP format (UTC)."""
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+# Shared database instance, created on first use so importing this module
+# does no disk I/O
+_db: Optional[DatabaseManager] = None
+_db_lock = threading.Lock()
+
+def get_db() -> DatabaseManager:
+    """Return the shared DatabaseManager, creating it on first call."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = DatabaseManager()
+    return _db 
\ No newline at end of file
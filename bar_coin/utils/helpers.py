@@ -3,22 +3,80 @@ Utility helper functions for BAR-COIN application.
 """
 
 import re
-import hashlib
 import bcrypt
 import logging
-from datetime import datetime, timedelta
+import operator
+import orjson
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
-from bar_coin.config.settings import PHILIPPINE_COINS, format_peso, get_coin_name
+from bar_coin.config.settings import PHILIPPINE_COINS, UI_CONFIG, format_peso, get_coin_name, is_valid_denomination
 
 logger = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
+# Validation patterns, compiled once at import; whole-string checks use
+# fullmatch(), since a '$' anchor also lets a trailing newline through
+_USERNAME_RE = re.compile(r'[a-zA-Z0-9_]+')
+# Upper, lower and digit checks fused into one anchored match of lookaheads
+_PWD_CLASSES_RE = re.compile(r'(?=[^A-Z]*[A-Z])(?=[^a-z]*[a-z])(?=\D*\d)')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# Every character sanitize_filename() removes or rewrites
+_FILENAME_CHANGED_CHARS = frozenset('<>:"/\\|?*@#$% ')
+# str.translate table over ASCII: unsafe characters are dropped and spaces
+# become underscores; code points past the end are left as they are
+_FILENAME_TRANSLATION = tuple(
+    '_' if char == ' ' else None if char in _FILENAME_CHANGED_CHARS else char
+    for char in map(chr, range(128))
+)
+
+# Hardware message schema
+_REQUIRED_FIELDS = ('type', 'denomination', 'timestamp')
+_COIN_MESSAGE_TYPES = frozenset(('coin', 'coin_detected'))
+
+# Display order and names of the coin table, fixed at import
+_SORTED_DENOMS = tuple(sorted(PHILIPPINE_COINS))
+_COIN_NAMES = {denomination: get_coin_name(denomination) for denomination in _SORTED_DENOMS}
+
+# Display format for timestamps (matches SQLite's CURRENT_TIMESTAMP)
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Hardware status display colors
+_STATUS_COLORS = {
+    'connected': 'green',
+    'disconnected': 'red',
+    'connecting': 'orange',
+    'error': 'orange',
+    'warning': 'yellow',
+    'processing': 'blue'
+}
+
+# Viewport width (px) at or below which the layout is treated as mobile
+MOBILE_BREAKPOINT = UI_CONFIG["mobile_breakpoint"]
+
+# bcrypt work factor (log2 of the key-expansion rounds)
+BCRYPT_ROUNDS = 12
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
+def hash_passwords(passwords: List[str], rounds: int = BCRYPT_ROUNDS,
+                   max_workers: Optional[int] = None) -> List[str]:
+    """Hash several passwords in parallel, preserving order.
+    
+    bcrypt's native hashpw releases the GIL, so the hashes run concurrently
+    on separate threads.
+    """
+    if len(passwords) <= 1:
+        return [hash_password(password, rounds) for password in passwords]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt") as pool:
+        return list(pool.map(hash_password, passwords, [rounds] * len(passwords)))
+
 def verify_password(password: str, hashed: str) -> bool:
     """Verify a password against its hash."""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
@@ -31,7 +89,7 @@ def validate_username(username: str) -> bool:
     if len(username) > 20:
         return False
     
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
+    if not _USERNAME_RE.fullmatch(username):
         return False
     
     return True
@@ -41,13 +99,8 @@ def validate_password(password: str) -> bool:
     if len(password) < 8:
         return False
     
-    if not re.search(r'[A-Z]', password):
-        return False
-    
-    if not re.search(r'[a-z]', password):
-        return False
-    
-    if not re.search(r'\d', password):
+    # Needs an uppercase letter, a lowercase letter and a digit
+    if _PWD_CLASSES_RE.match(password) is None:
         return False
     
     # Remove special character requirement for now
@@ -60,15 +113,12 @@ def validate_email(email: str) -> bool:
     """Validate email format."""
     if not email:  # Handle empty string
         return False
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.fullmatch(email))
 
 def calculate_total_value(coin_counts: Dict[float, int]) -> float:
     """Calculate total value from coin counts."""
-    total = 0.0
-    for denomination, count in coin_counts.items():
-        total += denomination * count
-    return total
+    # Multiply and sum in C; same insertion-order float sum as an explicit loop
+    return sum(map(operator.mul, coin_counts, coin_counts.values()), 0.0)
 
 def calculate_total_coins(coin_counts: Dict[float, int]) -> int:
     """Calculate total number of coins."""
@@ -76,42 +126,55 @@ def calculate_total_coins(coin_counts: Dict[float, int]) -> int:
 
 def format_coin_counts(coin_counts: Dict[float, int]) -> List[Dict[str, Any]]:
     """Format coin counts for display."""
-    formatted = []
-    for denomination in sorted(PHILIPPINE_COINS.keys()):
-        count = coin_counts.get(denomination, 0)
-        value = denomination * count
-        formatted.append({
+    get = coin_counts.get
+    return [
+        {
             'denomination': denomination,
-            'name': get_coin_name(denomination),
-            'count': count,
-            'value': value,
+            'name': _COIN_NAMES[denomination],
+            'count': (count := get(denomination, 0)),
+            'value': (value := denomination * count),
             'formatted_value': format_peso(value)
-        })
-    return formatted
+        }
+        for denomination in _SORTED_DENOMS
+    ]
 
 def get_coin_statistics(coin_counts: Dict[float, int]) -> Dict[str, Any]:
     """Get comprehensive coin statistics."""
-    total_coins = calculate_total_coins(coin_counts)
-    total_value = calculate_total_value(coin_counts)
+    # Everything is gathered in one pass over the counts
+    total_coins = 0
+    total_value = 0.0
+    nonzero = 0
+    most_common = least_common = (0.0, 0)
+    highest_denomination = lowest_denomination = None
     
-    # Find most and least common denominations
-    denominations_with_counts = [(d, c) for d, c in coin_counts.items() if c > 0]
+    for denomination, count in coin_counts.items():
+        total_coins += count
+        total_value += denomination * count
+        if highest_denomination is None:
+            highest_denomination = lowest_denomination = denomination
+        elif denomination > highest_denomination:
+            highest_denomination = denomination
+        elif denomination < lowest_denomination:
+            lowest_denomination = denomination
+        
+        if count > 0:
+            if not nonzero:
+                most_common = least_common = (denomination, count)
+            elif count > most_common[1]:
+                most_common = (denomination, count)
+            elif count < least_common[1]:
+                least_common = (denomination, count)
+            nonzero += 1
     
-    if denominations_with_counts:
-        most_common = max(denominations_with_counts, key=lambda x: x[1])
-        least_common = min(denominations_with_counts, key=lambda x: x[1])
-        highest_denomination = max(coin_counts.keys())
-        lowest_denomination = min(coin_counts.keys())
-    else:
-        most_common = least_common = (0.0, 0)
+    if not nonzero:
         highest_denomination = lowest_denomination = 0.0
     
     return {
         'total_coins': total_coins,
         'total_value': total_value,
         'formatted_total_value': format_peso(total_value),
-        'denominations': len([c for c in coin_counts.values() if c > 0]),
-        'unique_denominations': len([c for c in coin_counts.values() if c > 0]),
+        'denominations': nonzero,
+        'unique_denominations': nonzero,
         'highest_denomination': highest_denomination,
         'lowest_denomination': lowest_denomination,
         'most_common_denomination': most_common[0],
@@ -140,32 +203,35 @@ def format_duration(seconds: int) -> str:
 def format_timestamp(timestamp) -> str:
     """Format timestamp for display."""
     if isinstance(timestamp, datetime):
-        return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return timestamp.strftime(_TIMESTAMP_FORMAT)
+    if isinstance(timestamp, (int, float)):
+        # Unix seconds, as stored by the coin_counts and hardware_logs tables (UTC)
+        try:
+            return datetime.fromtimestamp(timestamp, timezone.utc).strftime(_TIMESTAMP_FORMAT)
+        except (OverflowError, OSError, ValueError):
+            return str(timestamp)
+    
+    text = timestamp if isinstance(timestamp, str) else str(timestamp)
     try:
-        dt = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
-    except:
-        return str(timestamp)
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).strftime(_TIMESTAMP_FORMAT)
+    except ValueError:
+        return text
 
 def generate_session_id() -> str:
     """Generate a unique session identifier."""
-    import time
-    import random
-    
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    random_num = random.randint(1000, 9999)
-    random_suffix = hashlib.md5(f"{time.time()}{random_num}".encode()).hexdigest()[:8]
-    return f"session{timestamp}{random_num}{random_suffix}"
+    # 12 random hex characters, the same length as the old number + hash suffix
+    return f"session{time.strftime('%Y%m%d%H%M%S')}{secrets.token_hex(6)}"
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file operations."""
     if not filename:
         return "untitled"
+    # Already-safe names (the common case) come back unchanged without a copy
+    if len(filename) <= 100 and _FILENAME_CHANGED_CHARS.isdisjoint(filename):
+        return filename
     
-    # Remove or replace unsafe characters
-    filename = re.sub(r'[<>:"/\\|?*@#$%]', '', filename)
-    # Replace spaces with underscores
-    filename = filename.replace(' ', '_')
+    # Remove unsafe characters and replace spaces with underscores in one pass
+    filename = filename.translate(_FILENAME_TRANSLATION)
     # Limit length
     if len(filename) > 100:
         name, ext = filename.rsplit('.', 1) if '.' in filename else (filename, '')
@@ -174,33 +240,44 @@ def sanitize_filename(filename: str) -> str:
 
 def create_export_filename(prefix: str, extension: str) -> str:
     """Create a filename for exports."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # time.strftime formats the local struct_time directly, skipping the datetime object
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     return sanitize_filename(f"{prefix}_export_{timestamp}.{extension}")
 
+def _coerce_denom(value: Any) -> Optional[float]:
+    """Convert a message denomination to float, or None if it is not numeric."""
+    if isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
 def parse_serial_data(data: str) -> Optional[Dict[str, Any]]:
     """Parse serial data from hardware."""
     try:
-        import json
-        parsed = json.loads(data.strip())
+        # orjson skips surrounding whitespace itself
+        parsed = orjson.loads(data)
         
         # Validate required fields
-        required_fields = ['type', 'denomination', 'timestamp']
-        if not all(field in parsed for field in required_fields):
-            logger.warning(f"Missing required fields in serial data: {data}")
+        if not all(field in parsed for field in _REQUIRED_FIELDS):
+            logger.warning("Missing required fields in serial data: %s", data)
             return None
         
         # Validate denomination
-        denomination = float(parsed['denomination'])
-        if denomination not in PHILIPPINE_COINS:
-            logger.warning(f"Invalid denomination in serial data: {denomination}")
+        denomination = _coerce_denom(parsed['denomination'])
+        if denomination is None or not is_valid_denomination(denomination):
+            logger.warning("Invalid denomination in serial data: %s", parsed['denomination'])
             return None
         
         return parsed
-    except json.JSONDecodeError:
-        logger.error(f"Invalid JSON in serial data: {data}")
+    except orjson.JSONDecodeError:
+        logger.error("Invalid JSON in serial data: %s", data)
         return None
     except (ValueError, TypeError) as e:
-        logger.error(f"Error parsing serial data: {e}")
+        logger.error("Error parsing serial data: %s", e)
         return None
 
 def validate_hardware_message(message: Dict[str, Any]) -> bool:
@@ -208,58 +285,43 @@ def validate_hardware_message(message: Dict[str, Any]) -> bool:
     if not isinstance(message, dict):
         return False
     
-    if 'type' not in message or message['type'] not in ['coin', 'coin_detected']:
+    message_type = message.get('type')
+    if not isinstance(message_type, str) or message_type not in _COIN_MESSAGE_TYPES:
         return False
     
     if 'denomination' not in message:
         return False
     
-    try:
-        denomination = float(message['denomination'])
-        if denomination not in PHILIPPINE_COINS:
-            return False
-    except (ValueError, TypeError):
-        return False
-    
-    return True
+    denomination = _coerce_denom(message['denomination'])
+    return denomination is not None and is_valid_denomination(denomination)
 
 def get_hardware_status_color(status: str) -> str:
     """Get color for hardware status display."""
-    status_colors = {
-        'connected': 'green',
-        'disconnected': 'red',
-        'connecting': 'orange',
-        'error': 'orange',
-        'warning': 'yellow',
-        'processing': 'blue'
-    }
-    return status_colors.get(status.lower(), 'gray')
+    return _STATUS_COLORS.get(status.lower(), 'gray')
+
+_SIZE_NAMES = ("B", "KB", "MB", "GB")
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format."""
     if size_bytes == 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
+    if size_bytes < 1024:
+        return f"{size_bytes:.0f} B"
     
-    if i == 0:  # Bytes
-        return f"{size_bytes:.0f} {size_names[i]}"
-    else:  # KB, MB, GB
-        return f"{size_bytes:.1f} {size_names[i]}"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f} {_SIZE_NAMES[i]}"
 
 def get_mobile_breakpoint() -> int:
     """Get mobile breakpoint for responsive design."""
-    return 768
+    return MOBILE_BREAKPOINT
 
 def is_mobile_viewport(width: int = None) -> bool:
     """Check if current viewport is mobile (simplified check)."""
     if width is None:
         return False
-    return width <= get_mobile_breakpoint()
+    return width <= MOBILE_BREAKPOINT
 
 def generate_qr_code_data(session_data: Dict[str, Any]) -> str:
     """Generate QR code data for session summary."""
@@ -281,8 +343,8 @@ def generate_qr_code_data(session_data: Dict[str, Any]) -> str:
     if 'app' not in data:
         data['app'] = 'BAR-COIN'
     
-    import json
-    return json.dumps(data)
+    # Compact separators also keep the QR payload small
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
 
 def validate_session_data(session_data: Dict[str, Any]) -> bool:
     """Validate session data before saving."""
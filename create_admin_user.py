@@ -5,12 +5,10 @@ This script creates a test admin user for development and testing purposes.
 """
 
 import sys
-from pathlib import Path
 
-# Add the project root to the path
-sys.path.insert(0, str(Path(__file__).parent))
-
-from bar_coin.utils.database import db
+# Run as a script, Python already puts this file's directory (the project
+# root) first on sys.path, so bar_coin imports without any path setup
+from bar_coin.utils.database import get_db
 from bar_coin.utils.helpers import hash_password
 
 import os
@@ -21,26 +19,26 @@ def create_admin_user():
         # Check if admin user already exists
         admin_username = os.environ.get('ADMIN_USERNAME', 'admin')
         admin_password = os.environ.get('ADMIN_PASSWORD', 'admin123')
-        existing_user = db.get_user_by_username(admin_username)
+        credentials = f"Username: {admin_username}\nPassword: {admin_password}"
+        existing_user = get_db().get_user_by_username(admin_username)
         if existing_user:
-            print("✓ Admin user already exists")
-            print(f"Username: {admin_username}")
-            print(f"Password: {admin_password}")
-            return
+            print(f"✓ Admin user already exists\n{credentials}")
+            return True
         
         # Create admin user
         username = admin_username
         password = admin_password
         email = "admin@barcoin.local"
         
-        user_id = db.create_user(username, password, email)
+        user_id = get_db().create_user(username, password, email)
         
-        print("✓ Admin user created successfully!")
-        print(f"Username: {admin_username}")
-        print(f"Password: {admin_password}")
-        print("Password: admin123")
-        print("Email: admin@barcoin.local")
-        print(f"User ID: {user_id}")
+        # One write for the whole report rather than a print per line
+        print("\n".join((
+            "✓ Admin user created successfully!",
+            credentials,
+            f"Email: {email}",
+            f"User ID: {user_id}",
+        )))
         
     except Exception as e:
         print(f"✗ Failed to create admin user: {e}")
@@ -49,18 +47,19 @@ def create_admin_user():
     return True
 
 if __name__ == "__main__":
-    print("=" * 50)
-    print("BAR-COIN Admin User Creator")
-    print("=" * 50)
+    banner = "=" * 50
+    print(f"{banner}\nBAR-COIN Admin User Creator\n{banner}")
     
     success = create_admin_user()
     
     if success:
-        print("\n" + "=" * 50)
-        print("You can now login to BAR-COIN with:")
-        print("Username: admin")
-        print("Password: admin123")
-        print("=" * 50)
+        print("\n".join((
+            "\n" + banner,
+            "You can now login to BAR-COIN with:",
+            f"Username: {os.environ.get('ADMIN_USERNAME', 'admin')}",
+            f"Password: {os.environ.get('ADMIN_PASSWORD', 'admin123')}",
+            banner,
+        )))
     else:
         print("\n✗ Failed to create admin user")
         sys.exit(1) 
\ No newline at end of file
@@ -6,11 +6,16 @@ This script initializes and runs the BAR-COIN Streamlit application.
 It handles environment setup, database initialization, and error handling.
 """
 
+import hashlib
 import os
 import sys
 import subprocess
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).parent
+# Fingerprint of the dependency files the last successful ``poetry check`` saw
+POETRY_CHECK_CACHE = PROJECT_ROOT / ".poetry_check_ok"
+
 def check_poetry_installation():
     """Check if Poetry is installed."""
     try:
@@ -23,12 +28,34 @@ def check_poetry_installation():
         print("  curl -sSL https://install.python-poetry.org | python3 -")
         return False
 
+def _dependency_fingerprint():
+    """Hash pyproject.toml and poetry.lock (when present) together."""
+    digest = hashlib.sha256()
+    for name in ('pyproject.toml', 'poetry.lock'):
+        path = PROJECT_ROOT / name
+        if path.exists():
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
 def check_dependencies():
     """Check if all dependencies are installed."""
+    fingerprint = _dependency_fingerprint()
+    try:
+        if POETRY_CHECK_CACHE.read_text() == fingerprint:
+            print("✓ Dependencies check passed (unchanged since last check)")
+            return True
+    except OSError:
+        pass
+    
     try:
         result = subprocess.run(['poetry', 'check'], 
                               capture_output=True, text=True, check=True)
         print("✓ Dependencies check passed")
+        try:
+            POETRY_CHECK_CACHE.write_text(fingerprint)
+        except OSError:
+            pass
         return True
     except subprocess.CalledProcessError as e:
         print(f"✗ Dependencies check failed: {e.stderr}")
@@ -74,9 +101,9 @@ def setup_environment():
 def initialize_database():
     """Initialize the database."""
     try:
-        # Import and initialize database
-        sys.path.insert(0, str(Path(__file__).parent))
-        from bar_coin.utils.database import db
+        # Import and initialize database (the project root is sys.path[0])
+        from bar_coin.utils.database import get_db
+        get_db()
         
         print("✓ Database initialized")
         return True
@@ -90,8 +117,7 @@ def run_application():
     try:
         # Set PYTHONPATH to include the project root
         env = os.environ.copy()
-        project_root = str(Path(__file__).parent)
-        env['PYTHONPATH'] = project_root + os.pathsep + env.get('PYTHONPATH', '')
+        env['PYTHONPATH'] = str(PROJECT_ROOT) + os.pathsep + env.get('PYTHONPATH', '')
         
         # Run with Poetry
         subprocess.run(['poetry', 'run', 'streamlit', 'run', 'bar_coin/app.py'], 
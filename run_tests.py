@@ -11,35 +11,39 @@ import subprocess
 import unittest
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).parent
+
+def run_tests_with_pytest():
+    """Run tests with pytest, in-process when it is importable."""
+    try:
+        import pytest
+    except ImportError:
+        return run_tests_with_poetry()
+    
+    print("Running tests with pytest...")
+    return pytest.main(['-v', str(PROJECT_ROOT / 'tests')]) == 0
+
 def run_tests_with_poetry():
     """Run tests using Poetry."""
     try:
         print("Running tests with Poetry...")
+        # Set PYTHONPATH to include the project root, as run.py does
+        env = os.environ.copy()
+        env['PYTHONPATH'] = str(PROJECT_ROOT) + os.pathsep + env.get('PYTHONPATH', '')
+        # Output streams straight to the terminal instead of being captured and reprinted
         result = subprocess.run(['poetry', 'run', 'python', '-m', 'pytest', 'tests/', '-v'], 
-                              capture_output=True, text=True)
-        
-        print("STDOUT:")
-        print(result.stdout)
-        
-        if result.stderr:
-            print("STDERR:")
-            print(result.stderr)
-        
+                              env=env, cwd=PROJECT_ROOT)
         return result.returncode == 0
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
         print(f"Failed to run tests: {e}")
         return False
 
 def run_tests_directly():
     """Run tests directly using unittest."""
     try:
-        # Add project root to path
-        project_root = Path(__file__).parent
-        sys.path.insert(0, str(project_root))
-        
-        # Discover and run tests
+        # Discover and run tests (the project root is already sys.path[0])
         loader = unittest.TestLoader()
-        start_dir = project_root / 'tests'
+        start_dir = PROJECT_ROOT / 'tests'
         suite = loader.discover(start_dir, pattern='test_*.py')
         
         runner = unittest.TextTestRunner(verbosity=2)
@@ -56,8 +60,8 @@ def main():
     print("BAR-COIN Test Runner")
     print("=" * 50)
     
-    # Try running with Poetry first
-    if run_tests_with_poetry():
+    # Try running with pytest first
+    if run_tests_with_pytest():
         print("\n✓ All tests passed!")
         return 0
     
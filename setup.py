@@ -84,19 +84,13 @@ def test_setup():
     print("\n🧪 Testing setup...")
     
     try:
-        # Test database initialization
+        # Test imports and database initialization in one interpreter start
         subprocess.run([
             'poetry', 'run', 'python', '-c',
-            'from bar_coin.utils.database import db; print("Database OK")'
-        ], check=True, capture_output=True)
-        print("✅ Database initialization test passed")
-        
-        # Test imports
-        subprocess.run([
-            'poetry', 'run', 'python', '-c',
-            'import bar_coin; print("Imports OK")'
+            'import bar_coin; from bar_coin.utils.database import get_db; get_db(); print("Setup OK")'
         ], check=True, capture_output=True)
         print("✅ Import test passed")
+        print("✅ Database initialization test passed")
         
         return True
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,62 @@
+"""
+Unit tests for configuration helpers in BAR-COIN application.
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+from bar_coin.config.compile_env import compile_env
+from bar_coin.config.settings import PHILIPPINE_COINS, VALID_DENOMINATIONS, is_valid_denomination
+
+
+class TestCompileEnv(unittest.TestCase):
+    """Test cases for compiling .env into a Python module."""
+
+    def setUp(self):
+        """Set up a temporary .env file."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.env_file = self.temp_dir / '.env'
+        self.env_file.write_text('SERIAL_PORT=/dev/ttyUSB0\nBAUD_RATE=115200\nSECRET_KEY="a \'quoted\' key"\n')
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_compile_env(self):
+        """Test the compiled module reproduces the .env values."""
+        output = compile_env(self.env_file, self.temp_dir / '_env_compiled.py')
+
+        namespace = {}
+        exec(output.read_text(encoding='utf-8'), namespace)
+
+        self.assertEqual(namespace['ENV'], {
+            'SERIAL_PORT': '/dev/ttyUSB0',
+            'BAUD_RATE': '115200',
+            'SECRET_KEY': "a 'quoted' key",
+        })
+
+
+class TestCoinTable(unittest.TestCase):
+    """Test cases for the Philippine coin table."""
+
+    def test_coin_table_is_read_only(self):
+        """Test the shared coin table cannot be modified."""
+        with self.assertRaises(TypeError):
+            PHILIPPINE_COINS[0.5] = {"name": "50 sentimo"}
+
+    def test_valid_denominations(self):
+        """Test exact and rounded denominations are accepted."""
+        self.assertEqual(VALID_DENOMINATIONS, frozenset(PHILIPPINE_COINS))
+        self.assertTrue(is_valid_denomination(0.25))
+        self.assertTrue(is_valid_denomination(0.7 - 0.6))
+        self.assertFalse(is_valid_denomination(0.5))
+        self.assertFalse(is_valid_denomination(0.251))
+        self.assertFalse(is_valid_denomination(0.2500001))
+        self.assertFalse(is_valid_denomination(20.004))
+        self.assertFalse(is_valid_denomination(float('nan')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,15 +5,11 @@ Unit tests for database operations in BAR-COIN application.
 import unittest
 import tempfile
 import os
+import shutil
 import sqlite3
 from unittest.mock import patch, MagicMock
-import sys
-import os
-
-# Add the project root to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from bar_coin.utils.database import DatabaseManager
+from bar_coin.utils.database import DatabaseManager, MEMORY_DB_PATH, SCHEMA_VERSION, format_epoch
 from bar_coin.utils.helpers import hash_password
 
 
@@ -21,51 +17,29 @@ class TestDatabaseManager(unittest.TestCase):
     """Test cases for DatabaseManager class."""
     
     def setUp(self):
-        """Set up test database."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = os.path.join(self.temp_dir, 'test_coins.db')
-        self.db_manager = DatabaseManager(self.db_path)
-        self.db_manager._init_database()
+        """Set up an in-memory test database."""
+        # These tests never verify passwords, so skip bcrypt; real hashing is
+        # covered by TestPasswordHelpers
+        patcher = patch('bar_coin.utils.database.hash_password',
+                        side_effect=lambda password: f"$2b$00$fake{password}")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db_manager = DatabaseManager(MEMORY_DB_PATH)
     
     def tearDown(self):
         """Clean up test database."""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-        os.rmdir(self.temp_dir)
+        self.db_manager.close()
     
     def test_init_database(self):
         """Test database initialization."""
-        # Check if tables exist
+        # Check that all tables exist
+        tables = ('users', 'sessions', 'coin_counts', 'hardware_logs')
         with self.db_manager._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check users table
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='users'
-            """)
-            self.assertIsNotNone(cursor.fetchone())
-            
-            # Check sessions table
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='sessions'
-            """)
-            self.assertIsNotNone(cursor.fetchone())
-            
-            # Check coin_counts table
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='coin_counts'
-            """)
-            self.assertIsNotNone(cursor.fetchone())
-            
-            # Check hardware_logs table
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='hardware_logs'
-            """)
-            self.assertIsNotNone(cursor.fetchone())
+            rows = conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type='table' AND name IN (?, ?, ?, ?)
+            """, tables).fetchall()
+        self.assertEqual({row['name'] for row in rows}, set(tables))
     
     def test_create_user(self):
         """Test user creation."""
@@ -84,6 +58,14 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(user['email'], email)
         self.assertTrue(user['password_hash'].startswith('$2b$'))
     
+    def test_create_user_with_hash(self):
+        """Test creating a user from a precomputed hash stores it unchanged."""
+        password_hash = hash_password("testpass123", rounds=4)
+        self.db_manager.create_user_with_hash("testuser", password_hash, "test@example.com")
+        
+        user = self.db_manager.get_user_by_username("testuser")
+        self.assertEqual(user['password_hash'], password_hash)
+    
     def test_duplicate_username(self):
         """Test creating user with duplicate username."""
         username = "testuser"
@@ -116,6 +98,17 @@ class TestDatabaseManager(unittest.TestCase):
         user = self.db_manager.get_user_by_username("nonexistent")
         self.assertIsNone(user)
     
+    def test_get_user_public(self):
+        """Test the public user lookup omits the password hash."""
+        self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        
+        user = self.db_manager.get_user_public("testuser")
+        self.assertEqual(user['username'], "testuser")
+        self.assertEqual(user['email'], "test@example.com")
+        self.assertNotIn('password_hash', user)
+        self.assertIn('password_hash', self.db_manager.get_user_by_username("testuser"))
+        self.assertIsNone(self.db_manager.get_user_public("nonexistent"))
+    
     def test_update_last_login(self):
         """Test updating last login timestamp."""
         username = "testuser"
@@ -166,9 +159,10 @@ class TestDatabaseManager(unittest.TestCase):
         session_id = self.db_manager.create_session(user_id, "test_session")
         
         # Add coin counts
-        self.db_manager.add_coin_count(session_id, 1, 10)  # 10 x 1 peso
-        self.db_manager.add_coin_count(session_id, 5, 5)   # 5 x 5 peso
-        self.db_manager.add_coin_count(session_id, 10, 3)  # 3 x 10 peso
+        with self.db_manager.transaction():
+            self.db_manager.add_coin_count(session_id, 1, 10)  # 10 x 1 peso
+            self.db_manager.add_coin_count(session_id, 5, 5)   # 5 x 5 peso
+            self.db_manager.add_coin_count(session_id, 10, 3)  # 3 x 10 peso
         
         # Get session counts
         counts = self.db_manager.get_session_counts(session_id)
@@ -179,6 +173,274 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(counts[5], 5)
         self.assertEqual(counts[10], 3)
     
+    def test_transaction(self):
+        """Test a transaction commits once on exit and rolls back as a whole."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        with self.db_manager.transaction() as conn:
+            self.db_manager.add_coin_count(session_id, 1, 2)
+            with self.db_manager.transaction():
+                self.db_manager.add_coin_count(session_id, 5, 1)
+            # Nothing is committed until the outermost block exits
+            self.assertTrue(conn.in_transaction)
+        self.assertFalse(conn.in_transaction)
+        
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db_manager.transaction():
+                self.db_manager.add_coin_count(session_id, 10, 1)
+                self.db_manager.add_coin_count(9999, 1, 1)
+        
+        self.assertEqual(self.db_manager.get_session_counts(session_id), {1: 2, 5: 1})
+    
+    def test_transaction_with_caught_error_commits_nothing(self):
+        """Test a failure caught inside a transaction still rolls back the whole block."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db_manager.transaction():
+                self.db_manager.add_coin_count(session_id, 1, 2)
+                try:
+                    self.db_manager.add_coin_count(9999, 1, 1)
+                except sqlite3.IntegrityError:
+                    pass
+                self.db_manager.add_coin_count(session_id, 5, 1)
+        
+        self.assertEqual(self.db_manager.get_session_counts(session_id), {})
+        
+        # The manager is usable again afterwards
+        with self.db_manager.transaction():
+            self.db_manager.add_coin_count(session_id, 10, 1)
+        self.assertEqual(self.db_manager.get_session_counts(session_id), {10: 1})
+    
+    def test_query_indexes(self):
+        """Test session and hardware log lookups use indexes."""
+        with self.db_manager._get_connection() as conn:
+            plan = conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT * FROM sessions WHERE user_id = ? ORDER BY start_time DESC LIMIT 10
+            """, (1,)).fetchall()
+            self.assertIn("idx_sessions_user_start", plan[0]['detail'])
+            
+            plan = conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT * FROM hardware_logs WHERE session_id = ? ORDER BY timestamp DESC LIMIT 10
+            """, (1,)).fetchall()
+            self.assertIn("idx_hardware_logs_session_timestamp", plan[0]['detail'])
+    
+    def test_add_coin_counts_bulk(self):
+        """Test adding several denominations in one call."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        self.db_manager.add_coin_count(session_id, 1, 2)
+        self.db_manager.add_coin_counts_bulk(session_id, [(1, 3), (5, 4)])
+        
+        counts = self.db_manager.get_session_counts(session_id)
+        self.assertEqual(counts[1], 5)
+        self.assertEqual(counts[5], 4)
+    
+    def test_duplicate_coin_counts_merged_on_init(self):
+        """Test legacy duplicate coin count rows are merged before indexing."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        with self.db_manager._get_connection() as conn:
+            conn.execute("DROP INDEX idx_coin_counts_session_denomination")
+            conn.executemany("""
+                INSERT INTO coin_counts (session_id, denomination_cents, count, value_cents)
+                VALUES (?, ?, ?, ?)
+            """, [(session_id, 500, 2, 1000), (session_id, 500, 3, 1500)])
+            conn.commit()
+        
+        self.db_manager._init_database()
+        self.db_manager.add_coin_count(session_id, 5, 1)
+        
+        with self.db_manager._get_connection() as conn:
+            rows = conn.execute("SELECT count, value_cents FROM coin_counts WHERE session_id = ?",
+                                (session_id,)).fetchall()
+        self.assertEqual([tuple(row) for row in rows], [(6, 3000)])
+        self.assertEqual(self.db_manager.get_session_summary(session_id)['total_value'], 30)
+    
+    def test_session_totals_follow_coin_counts(self):
+        """Test triggers keep session totals in step with coin count changes."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        self.db_manager.add_coin_count(session_id, 5, 2)
+        self.db_manager.add_coin_counts_bulk(session_id, [(5, 1), (1, 4)])
+        summary = self.db_manager.get_session_summary(session_id)
+        self.assertEqual(summary['total_value'], 19)
+        self.assertEqual(summary['total_coins'], 7)
+        
+        with self.db_manager._get_connection() as conn:
+            conn.execute("DELETE FROM coin_counts WHERE session_id = ? AND denomination_cents = 100", (session_id,))
+            conn.commit()
+        summary = self.db_manager.get_session_summary(session_id)
+        self.assertEqual(summary['total_value'], 15)
+        self.assertEqual(summary['total_coins'], 3)
+        
+        self.db_manager.end_session(session_id)
+        summary = self.db_manager.get_session_summary(session_id)
+        self.assertEqual(summary['status'], 'completed')
+        self.assertEqual(summary['total_value'], 15)
+    
+    def test_amounts_migrated_to_cents(self):
+        """Test a database with peso amount columns is converted to centavos."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        legacy_path = os.path.join(temp_dir, 'legacy.db')
+        legacy = sqlite3.connect(legacy_path)
+        legacy.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                                password_hash TEXT NOT NULL, email TEXT UNIQUE,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                last_login TIMESTAMP, is_active BOOLEAN DEFAULT 1);
+            CREATE TABLE sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                                   start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, end_time TIMESTAMP,
+                                   total_value DECIMAL(10,2) DEFAULT 0.00, total_coins INTEGER DEFAULT 0,
+                                   status TEXT DEFAULT 'active');
+            CREATE TABLE coin_counts (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+                                      denomination DECIMAL(4,2) NOT NULL, count INTEGER DEFAULT 0,
+                                      value DECIMAL(10,2) DEFAULT 0.00,
+                                      timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO users (username, password_hash) VALUES ('legacy', 'x');
+            INSERT INTO sessions (user_id, total_value, total_coins) VALUES (1, 0.75, 3);
+            INSERT INTO coin_counts (session_id, denomination, count, value) VALUES (1, 0.25, 3, 0.75);
+        """)
+        legacy.close()
+        
+        migrated = DatabaseManager(legacy_path)
+        try:
+            self.assertEqual(migrated.get_session_counts(1), {0.25: 3})
+            migrated.add_coin_count(1, 0.1, 2)
+            summary = migrated.get_session_summary(1)
+            self.assertAlmostEqual(summary['total_value'], 0.95)
+            self.assertEqual(summary['total_coins'], 5)
+            with migrated._get_connection() as conn:
+                self.assertEqual(conn.execute("SELECT total_value_cents FROM sessions").fetchone()[0], 95)
+                self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        finally:
+            migrated.close()
+    
+    def test_failed_migration_applies_nothing(self):
+        """Test a migration that fails part-way leaves the legacy database untouched."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        legacy_path = os.path.join(temp_dir, 'legacy.db')
+        legacy = sqlite3.connect(legacy_path)
+        legacy.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                                password_hash TEXT NOT NULL, email TEXT UNIQUE,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                last_login TIMESTAMP, is_active BOOLEAN DEFAULT 1);
+            CREATE TABLE sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                                   start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, end_time TIMESTAMP,
+                                   total_value DECIMAL(10,2) DEFAULT 0.00, total_coins INTEGER DEFAULT 0,
+                                   status TEXT DEFAULT 'active');
+            CREATE TABLE coin_counts (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+                                      denomination DECIMAL(4,2) NOT NULL, count INTEGER DEFAULT 0,
+                                      value DECIMAL(10,2) DEFAULT 0.00,
+                                      timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO users (username, password_hash) VALUES ('legacy', 'x');
+            INSERT INTO sessions (user_id, total_value, total_coins) VALUES (1, 0.75, 3);
+            INSERT INTO coin_counts (session_id, denomination, count, value, timestamp)
+                VALUES (1, 0.25, 3, 0.75, '2024-01-01 12:00:00');
+            -- Fails the session rescale, after the renames and the coin_counts rescale
+            CREATE TRIGGER fail_session_rescale BEFORE UPDATE ON sessions
+            BEGIN
+                SELECT RAISE(ABORT, 'rescale failed');
+            END;
+        """)
+        legacy.close()
+        
+        with self.assertRaises(sqlite3.DatabaseError):
+            DatabaseManager(legacy_path)
+        
+        legacy = sqlite3.connect(legacy_path)
+        try:
+            self.assertEqual(legacy.execute("PRAGMA user_version").fetchone()[0], 0)
+            self.assertEqual(legacy.execute("SELECT denomination, value, timestamp FROM coin_counts").fetchone(),
+                             (0.25, 0.75, '2024-01-01 12:00:00'))
+            self.assertEqual(legacy.execute("SELECT total_value FROM sessions").fetchone()[0], 0.75)
+            legacy.execute("DROP TRIGGER fail_session_rescale")
+            legacy.commit()
+        finally:
+            legacy.close()
+        
+        # With the fault gone, a rerun migrates from the untouched data
+        migrated = DatabaseManager(legacy_path)
+        self.addCleanup(migrated.close)
+        self.assertEqual(migrated.get_session_counts(1), {0.25: 3})
+        with migrated._get_connection() as conn:
+            self.assertEqual(conn.execute("SELECT total_value_cents FROM sessions").fetchone()[0], 75)
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+    
+    def test_inserts_after_upgrade_use_epoch_timestamps(self):
+        """Test rows written after upgrading a text-timestamp database store unix seconds."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        legacy_path = os.path.join(temp_dir, 'legacy.db')
+        legacy = sqlite3.connect(legacy_path)
+        legacy.executescript("""
+            CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                                password_hash TEXT NOT NULL, email TEXT UNIQUE,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                last_login TIMESTAMP, is_active BOOLEAN DEFAULT 1);
+            CREATE TABLE sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                                   start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, end_time TIMESTAMP,
+                                   total_value DECIMAL(10,2) DEFAULT 0.00, total_coins INTEGER DEFAULT 0,
+                                   status TEXT DEFAULT 'active');
+            CREATE TABLE coin_counts (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+                                      denomination DECIMAL(4,2) NOT NULL, count INTEGER DEFAULT 0,
+                                      value DECIMAL(10,2) DEFAULT 0.00,
+                                      timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            CREATE TABLE hardware_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER,
+                                        event_type TEXT NOT NULL, message TEXT,
+                                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+            INSERT INTO users (username, password_hash) VALUES ('legacy', 'x');
+            INSERT INTO sessions (user_id) VALUES (1);
+            INSERT INTO coin_counts (session_id, denomination, count, value) VALUES (1, 1, 2, 2);
+            INSERT INTO hardware_logs (session_id, event_type, message) VALUES (1, 'INFO', 'old');
+        """)
+        legacy.close()
+        
+        migrated = DatabaseManager(legacy_path)
+        self.addCleanup(migrated.close)
+        migrated.add_coin_count(1, 1, 1)   # update of a migrated row
+        migrated.add_coin_count(1, 5, 1)   # new row
+        migrated.add_coin_counts_bulk(1, [(10, 1)])
+        migrated.add_hardware_log(1, "INFO", "new")
+        migrated.add_hardware_logs_bulk([(1, "INFO", "newer")])
+        
+        with migrated._get_connection() as conn:
+            for table in ("coin_counts", "hardware_logs"):
+                types = {row[0] for row in conn.execute(f"SELECT typeof(timestamp) FROM {table}")}
+                self.assertEqual(types, {'integer'}, table)
+        
+        exported = migrated.export_session_data(1)
+        self.assertEqual(len(exported['hardware_logs']), 3)
+        self.assertTrue(all(isinstance(log['timestamp'], str) for log in exported['hardware_logs']))
+    
+    def test_text_timestamps_written_after_upgrade_are_converted(self):
+        """Test text rows left by an earlier upgrade are converted at schema v3."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        with self.db_manager._get_connection() as conn:
+            conn.execute("""
+                INSERT INTO hardware_logs (session_id, event_type, message, timestamp)
+                VALUES (?, 'INFO', 'stray', '2024-01-01 12:00:00')
+            """, (session_id,))
+            conn.execute("PRAGMA user_version = 2")
+            conn.commit()
+        
+        self.db_manager._init_database()
+        
+        logs = self.db_manager.get_hardware_logs(session_id)
+        self.assertEqual(format_epoch(logs[0]['timestamp']), '2024-01-01 12:00:00')
+    
     def test_session_summary(self):
         """Test session summary calculation."""
         username = "testuser"
@@ -190,15 +452,57 @@ class TestDatabaseManager(unittest.TestCase):
         session_id = self.db_manager.create_session(user_id, "test_session")
         
         # Add coin counts
-        self.db_manager.add_coin_count(session_id, 1, 10)  # 10 peso
-        self.db_manager.add_coin_count(session_id, 5, 5)   # 25 peso
-        self.db_manager.add_coin_count(session_id, 10, 3)  # 30 peso
+        self.db_manager.add_coin_counts_bulk(session_id, [
+            (1, 10),  # 10 peso
+            (5, 5),   # 25 peso
+            (10, 3),  # 30 peso
+        ])
         
         # Get summary
         summary = self.db_manager.get_session_summary(session_id)
-        self.assertIsNotNone(summary)
-        self.assertEqual(summary['total_value'], 65)  # 10 + 25 + 30
-        self.assertEqual(summary['total_coins'], 18)  # 10 + 5 + 3
+        self.assertEqual(
+            {key: summary[key] for key in ('username', 'status', 'total_value', 'total_coins')},
+            {'username': username, 'status': 'active',
+             'total_value': 65,   # 10 + 25 + 30
+             'total_coins': 18},  # 10 + 5 + 3
+        )
+    
+    def test_get_dashboard_bundle(self):
+        """Test fetching recent sessions and daily stats together."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        for _ in range(3):
+            session_id = self.db_manager.create_session(user_id, "test_session")
+            self.db_manager.add_coin_count(session_id, 5, 2)
+            self.db_manager.end_session(session_id)
+        
+        sessions, daily_stats = self.db_manager.get_dashboard_bundle(user_id, session_limit=2)
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(sessions[0]['calculated_coins'], 2)
+        self.assertEqual(len(daily_stats), 1)
+        self.assertEqual(daily_stats[0]['sessions'], 3)
+        self.assertEqual(daily_stats[0]['total_value'], 30)
+    
+    def test_get_user_sessions_totals(self):
+        """Test session listing aggregates each session's coin counts."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        counted = self.db_manager.create_session(user_id, "counted")
+        self.db_manager.add_coin_counts_bulk(counted, [(1, 3), (10, 2)])
+        empty = self.db_manager.create_session(user_id, "empty")
+        
+        sessions = {row['id']: row for row in self.db_manager.get_user_sessions(user_id)}
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(sessions[counted]['calculated_coins'], 5)
+        self.assertEqual(sessions[counted]['calculated_value'], 23)
+        self.assertEqual(sessions[empty]['calculated_coins'], 0)
+    
+    def test_get_daily_stats_days_is_bound(self):
+        """Test the day window is validated and bound rather than formatted into SQL."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        self.db_manager.create_session(user_id, "test_session")
+        
+        self.assertEqual(len(self.db_manager.get_daily_stats(user_id, days=7)), 1)
+        with self.assertRaises(ValueError):
+            self.db_manager.get_daily_stats(user_id, days="7 days') OR 1=1 --")
     
     def test_hardware_logging(self):
         """Test hardware log operations."""
@@ -222,6 +526,38 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(logs[0]['message'], "Test hardware message")
         self.assertEqual(logs[0]['event_type'], "INFO")
     
+    def test_session_counts_sorted(self):
+        """Test the presentation variant orders counts by denomination."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        self.db_manager.add_coin_counts_bulk(session_id, [(10, 1), (0.25, 4), (5, 2)])
+        
+        self.assertEqual(self.db_manager.get_session_counts(session_id), {10: 1, 0.25: 4, 5: 2})
+        self.assertEqual(list(self.db_manager.get_session_counts_sorted(session_id)), [0.25, 5, 10])
+        
+        exported = self.db_manager.export_session_data(session_id)
+        self.assertEqual([c['denomination'] for c in exported['coin_counts']], [0.25, 5, 10])
+    
+    def test_add_hardware_logs_bulk(self):
+        """Test several hardware log entries are stored in one call."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        self.db_manager.add_hardware_logs_bulk([
+            (session_id, "INFO", "Connected"),
+            (session_id, "ERROR", "Serial read error"),
+            (None, "INFO", "Disconnected"),
+        ])
+        
+        logs = self.db_manager.get_hardware_logs(session_id)
+        self.assertEqual(sorted(log['message'] for log in logs), ["Connected", "Serial read error"])
+        self.assertEqual(len(self.db_manager.get_hardware_logs()), 3)
+    
+    def test_foreign_keys_enforced(self):
+        """Test coin counts cannot reference a missing session."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db_manager.add_coin_count(9999, 1, 1)
+    
     def test_export_session_data(self):
         """Test session data export."""
         username = "testuser"
@@ -233,28 +569,62 @@ class TestDatabaseManager(unittest.TestCase):
         session_id = self.db_manager.create_session(user_id, "test_session")
         
         # Add some data
-        self.db_manager.add_coin_count(session_id, 1, 10)
-        self.db_manager.add_hardware_log(session_id, "INFO", "Test log")
+        self.db_manager.add_coin_counts_bulk(session_id, [(1, 10)])
+        self.db_manager.add_hardware_logs_bulk([(session_id, "INFO", "Test log")])
         
         # Export data
         data = self.db_manager.export_session_data(session_id)
-        self.assertIsNotNone(data)
-        self.assertIn('session_info', data)
-        self.assertIn('coin_counts', data)
-        self.assertIn('hardware_logs', data)
+        self.assertEqual(set(data), {'session_info', 'coin_counts', 'hardware_logs'})
         
         # Verify session info
-        self.assertEqual(data['session_info']['user_id'], user_id)
-        self.assertEqual(data['session_info']['name'], f"Session {session_id}")
+        session_info = data['session_info']
+        self.assertEqual(
+            {key: session_info[key] for key in ('id', 'user_id', 'name', 'total_value', 'total_coins')},
+            {'id': session_id, 'user_id': user_id, 'name': f"Session {session_id}",
+             'total_value': 10, 'total_coins': 10},
+        )
         
         # Verify coin counts
-        self.assertEqual(len(data['coin_counts']), 1)
-        self.assertEqual(data['coin_counts'][0]['denomination'], 1)
-        self.assertEqual(data['coin_counts'][0]['count'], 10)
+        self.assertEqual(data['coin_counts'], [{'denomination': 1, 'count': 10, 'value': 10}])
         
         # Verify hardware logs
-        self.assertEqual(len(data['hardware_logs']), 1)
-        self.assertEqual(data['hardware_logs'][0]['message'], "Test log")
+        self.assertEqual(
+            [(log['session_id'], log['event_type'], log['message']) for log in data['hardware_logs']],
+            [(session_id, "INFO", "Test log")],
+        )
+
+    def test_text_timestamps_migrated_to_epoch(self):
+        """Test legacy text timestamps are converted to unix seconds on init."""
+        user_id = self.db_manager.create_user("testuser", "testpass123", "test@example.com")
+        session_id = self.db_manager.create_session(user_id, "test_session")
+        
+        with self.db_manager._get_connection() as conn:
+            conn.execute("""
+                INSERT INTO hardware_logs (session_id, event_type, message, timestamp)
+                VALUES (?, 'INFO', 'legacy', '2024-01-01 12:00:00')
+            """, (session_id,))
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        
+        self.db_manager._init_database()
+        self.db_manager.add_hardware_log(session_id, "INFO", "new")
+        
+        logs = self.db_manager.get_hardware_logs(session_id)
+        self.assertEqual([log['message'] for log in logs], ["new", "legacy"])
+        self.assertTrue(all(isinstance(log['timestamp'], int) for log in logs))
+        self.assertEqual(format_epoch(logs[1]['timestamp']), '2024-01-01 12:00:00')
+        
+        exported = self.db_manager.export_session_data(session_id)
+        self.assertEqual(exported['hardware_logs'][1]['timestamp'], '2024-01-01 12:00:00')
+    
+    def test_failed_operation_rolls_back(self):
+        """Test an error inside the shared connection discards its writes."""
+        with self.assertRaises(RuntimeError):
+            with self.db_manager._get_connection() as conn:
+                conn.execute("INSERT INTO users (username, password_hash) VALUES ('ghost', 'x')")
+                raise RuntimeError("boom")
+        
+        self.assertIsNone(self.db_manager.get_user_by_username('ghost'))
 
 
 class TestDatabaseConnection(unittest.TestCase):
@@ -276,7 +646,12 @@ class TestDatabaseConnection(unittest.TestCase):
                 result = cursor.fetchone()
                 self.assertEqual(result[0], 1)
 
-            # Connection should be closed (check by trying to use it)
+            # The shared connection stays open and is reused
+            with db_manager._get_connection() as conn2:
+                self.assertIs(conn2, conn)
+
+            # Connection should be closed after close() (check by trying to use it)
+            db_manager.close()
             try:
                 conn.execute("SELECT 1")
                 self.fail("Connection should be closed")
@@ -288,6 +663,19 @@ class TestDatabaseConnection(unittest.TestCase):
             if os.path.exists(db_path):
                 os.remove(db_path)
             os.rmdir(temp_dir)
+    
+    def test_file_connection_pragmas(self):
+        """Test a file-backed database runs in WAL mode with relaxed syncing."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        db_manager = DatabaseManager(os.path.join(temp_dir, 'test_coins.db'))
+        self.addCleanup(db_manager.close)
+        
+        with db_manager._get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            # 1 = NORMAL, 2 = MEMORY
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
 
 
 if __name__ == '__main__':
@@ -4,11 +4,17 @@ Tests for hardware functionality.
 
 import pytest
 import json
+import asyncio
+import threading
+from queue import Empty
 from datetime import datetime
 from unittest.mock import Mock, patch
 
+from bar_coin.config.settings import VALID_DENOMINATIONS
+from bar_coin.hardware.coin_counter import CoinCounter
 from bar_coin.hardware.mock_hardware import MockHardware
-from bar_coin.hardware.serial_handler import SerialHandler
+from bar_coin.hardware.serial_handler import SerialHandler, _RingBuffer, _SerialProtocol, set_low_latency
+from bar_coin.hardware.event_queue import EventQueue
 from bar_coin.utils.helpers import parse_serial_data, validate_hardware_message
 
 class TestMockHardware:
@@ -54,6 +60,16 @@ class TestMockHardware:
         assert 'denomination' in parsed
         assert 'timestamp' in parsed
     
+    def test_mock_coin_denominations_are_valid(self):
+        """Test prefetched denominations are supported coins."""
+        hardware = MockHardware()
+        hardware.connect()
+        
+        for _ in range(10):
+            hardware._simulate_coin_detection()
+            parsed = json.loads(hardware.read_data())
+            assert parsed['denomination'] in hardware.denominations
+    
     def test_mock_error_simulation(self):
         """Test mock error simulation."""
         hardware = MockHardware()
@@ -71,6 +87,167 @@ class TestMockHardware:
         assert parsed['type'] == 'error'
         assert 'error_type' in parsed
 
+    def test_read_data_empty(self):
+        """Test non-blocking reads on an empty or disconnected queue."""
+        hardware = MockHardware()
+        assert hardware.read_data() is None
+        
+        hardware.connect()
+        assert hardware.read_data() is None
+    
+    def test_read_data_timeout(self):
+        """Test blocking read returns None once the timeout expires."""
+        hardware = MockHardware()
+        hardware.connect()
+        
+        assert hardware.read_data(timeout=0.05) is None
+        
+        hardware._simulate_coin_detection()
+        assert hardware.read_data(timeout=0.05) is not None
+
+    def test_simulate_batch_without_delay(self):
+        """Test enqueuing a batch of coins without per-coin delay."""
+        hardware = MockHardware()
+        hardware.connect()
+        
+        hardware.simulate_batch([1.0, 5.0, 999.0], count=3, delay=0)
+        
+        assert hardware.data_queue.qsize() == 6
+        assert hardware.stats['coins_simulated'] == 6
+        denominations = [json.loads(hardware.read_data())['denomination'] for _ in range(6)]
+        assert denominations == [1.0, 5.0] * 3
+
+class TestEventQueue:
+    """Test event queue behaviour."""
+    
+    def test_fifo_and_empty(self):
+        """Test items come out in order and empty reads raise Empty."""
+        events = EventQueue()
+        events.put(1)
+        events.put(2)
+        
+        assert events.qsize() == 2
+        assert events.get_nowait() == 1
+        assert events.get(timeout=0.01) == 2
+        assert events.empty()
+        with pytest.raises(Empty):
+            events.get_nowait()
+        with pytest.raises(Empty):
+            events.get(timeout=0.01)
+    
+    def test_blocking_get_wakes_on_put(self):
+        """Test a blocked consumer is woken by a producer thread."""
+        events = EventQueue()
+        producer = threading.Timer(0.05, events.put, args=("coin",))
+        producer.start()
+        
+        assert events.get(timeout=2) == "coin"
+        producer.join()
+    
+    def test_drain(self):
+        """Test draining returns at most the requested number of items."""
+        events = EventQueue()
+        for item in range(5):
+            events.put(item)
+        
+        assert events.drain(3) == [0, 1, 2]
+        assert events.drain(10) == [3, 4]
+        assert events.drain(10) == []
+
+class TestCoinCounter:
+    """Test coin counter queue handling."""
+    
+    def test_drain_pending_is_bounded(self):
+        """Test draining queued messages in bounded batches."""
+        counter = CoinCounter(mock_mode=True)
+        for _ in range(5):
+            counter.data_queue.put({'type': 'coin_detected', 'denomination': 1.0})
+        
+        assert len(counter.drain_pending(max_items=3)) == 3
+        assert len(counter.drain_pending(max_items=3)) == 2
+        assert counter.drain_pending() == []
+    
+    def test_clear_data_queue(self):
+        """Test clearing discards every queued message."""
+        counter = CoinCounter(mock_mode=True)
+        for _ in range(5):
+            counter.data_queue.put({'type': 'coin_detected', 'denomination': 1.0})
+        
+        counter.clear_data_queue()
+        assert counter.data_queue.empty()
+    
+    def test_callbacks_share_event(self):
+        """Test callbacks receive the same event and can be removed."""
+        counter = CoinCounter(mock_mode=True)
+        received = []
+        counter.add_callback(received.append)
+        counter.add_callback(received.append)
+        
+        counter._handle_coin_detection({'type': 'coin_detected', 'denomination': 1.0})
+        assert len(received) == 2
+        assert received[0] is received[1]
+        assert received[0]['denomination'] == 1.0
+        
+        counter.remove_callback(received.append)
+        counter._handle_coin_detection({'type': 'coin_detected', 'denomination': 1.0})
+        assert len(received) == 3
+    
+    def test_failing_callback_does_not_block_others(self):
+        """Test a raising callback does not stop later callbacks."""
+        counter = CoinCounter(mock_mode=True)
+        received = []
+        counter.add_callback(Mock(side_effect=RuntimeError("boom")))
+        counter.add_callback(received.append)
+        
+        counter._handle_coin_detection({'type': 'coin_detected', 'denomination': 1.0})
+        assert len(received) == 1
+    
+    def test_hardware_mode_does_not_open_database(self):
+        """Test constructing a hardware counter leaves the DatabaseManager uncreated."""
+        with patch('bar_coin.utils.database._db', None), \
+             patch('bar_coin.utils.database.DatabaseManager') as manager:
+            counter = CoinCounter(mock_mode=False)
+            manager.assert_not_called()
+            
+            counter.hardware._log_sink([(1, 'INFO', 'connected')])
+            manager.return_value.add_hardware_logs_bulk.assert_called_once_with([(1, 'INFO', 'connected')])
+    
+    def test_process_data_queues_canonical_denomination(self):
+        """Test float noise is normalised before stats and queue see the coin."""
+        counter = CoinCounter(mock_mode=True)
+        counter._process_data(json.dumps({'type': 'coin_detected', 'denomination': 0.7 - 0.6,
+                                          'timestamp': '2024-01-01T12:00:00'}))
+        
+        assert counter.stats['total_coins_processed'] == 1
+        assert [data['denomination'] for data in counter.drain_pending()] == [0.1]
+        assert 0.1 in VALID_DENOMINATIONS
+    
+    def test_process_data_rejects_near_miss_denomination(self):
+        """Test a near-miss denomination is neither counted nor queued."""
+        counter = CoinCounter(mock_mode=True)
+        counter._process_data(json.dumps({'type': 'coin_detected', 'denomination': 0.251,
+                                          'timestamp': '2024-01-01T12:00:00'}))
+        
+        assert counter.stats['total_coins_processed'] == 0
+        assert counter.stats['warnings'] == 1
+        assert counter.drain_pending() == []
+    
+    def test_session_timing_stats(self):
+        """Test session speed and duration use monotonic timing."""
+        counter = CoinCounter(mock_mode=True)
+        counter.is_connected = True
+        assert counter.start_session(1)
+        
+        counter._handle_coin_detection({'type': 'coin_detected', 'denomination': 5.0})
+        counter._update_processing_speed()
+        assert counter.stats['processing_speed'] > 0
+        assert counter.stats['last_coin_ns'] is not None
+        
+        session_stats = counter.end_session()
+        assert session_stats['total_coins'] == 1
+        assert session_stats['duration'] >= 0
+        assert counter.stats['session_start_ns'] is None
+
 class TestSerialHandler:
     """Test serial handler functionality."""
     
@@ -93,6 +270,169 @@ class TestSerialHandler:
         handler.disconnect()
         assert handler.is_connected == False
 
+    def test_read_data_splits_bulk_reads(self):
+        """Test pending bytes are read in one call and split into lines."""
+        handler = SerialHandler(port="COM3", baudrate=9600)
+        port = Mock()
+        port.in_waiting = 9
+        port.read.return_value = b'A\r\nBB\nCC'
+        handler.serial_conn = port
+        handler.is_connected = True
+        
+        assert handler.read_data() == 'A'
+        port.in_waiting = 0
+        assert handler.read_data() == 'BB'
+        assert handler.read_data() is None
+        port.read.assert_called_once_with(9)
+        
+        port.in_waiting = 1
+        port.read.return_value = b'\n'
+        assert handler.read_data() == 'CC'
+        assert handler.stats['bytes_received'] == 9
+
+    def test_read_data_blocks_for_given_timeout(self):
+        """Test a blocking read waits on the port with the caller's timeout."""
+        handler = SerialHandler(port="COM3", baudrate=9600, timeout=1)
+        port = Mock()
+        port.timeout = 1
+        port.in_waiting = 0
+        port.read.return_value = b''
+        handler.serial_conn = port
+        handler.is_connected = True
+        
+        assert handler.read_data(timeout=0.5) is None
+        assert port.timeout == 0.5
+        port.read.assert_called_once_with(1)
+        
+        # A non-blocking read neither waits nor touches the port timeout
+        port.read.reset_mock()
+        port.timeout = 1
+        assert handler.read_data() is None
+        assert port.timeout == 1
+        port.read.assert_not_called()
+
+    def test_available_ports_cached(self):
+        """Test port enumeration is reused within the cache TTL."""
+        handler = SerialHandler(port="COM3", baudrate=9600)
+        with patch('bar_coin.hardware.serial_handler.list_ports.comports') as comports:
+            comports.return_value = [Mock(device="/dev/ttyUSB0")]
+            assert handler.get_available_ports() == ["/dev/ttyUSB0"]
+            assert handler.get_connection_info()['available_ports'] == ["/dev/ttyUSB0"]
+            assert comports.call_count == 1
+            
+            handler._ports_cache_ts -= 10
+            handler.get_available_ports()
+            assert comports.call_count == 2
+
+    def test_log_events_batched(self):
+        """Test connection events reach the log sink in batches."""
+        batches = []
+        handler = SerialHandler(port="COM3", baudrate=9600, log_sink=batches.append)
+        handler.session_id = 7
+        port = Mock()
+        port.is_open = True
+        handler.serial_conn = port
+        handler.is_connected = True
+        
+        for i in range(3):
+            handler._log_event("INFO", f"event {i}")
+        handler.disconnect()
+        
+        entries = [entry for batch in batches for entry in batch]
+        assert entries[:3] == [(7, "INFO", f"event {i}") for i in range(3)]
+        assert entries[-1] == (7, "INFO", "Disconnected from COM3")
+        assert handler._log_thread is None
+
+    def test_log_writer_started_once_across_threads(self):
+        """Test concurrent first log events start a single writer thread."""
+        handler = SerialHandler(port="COM3", baudrate=9600, log_sink=Mock())
+        barrier = threading.Barrier(8)
+        
+        def log():
+            barrier.wait()
+            handler._log_event("INFO", "event")
+        
+        # Created before patching, since the patch replaces threading.Thread itself
+        workers = [threading.Thread(target=log) for _ in range(8)]
+        with patch('bar_coin.hardware.serial_handler.threading.Thread') as thread_cls:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        
+        assert thread_cls.call_count == 1
+        assert handler._log_queue.qsize() == 8
+
+    def test_send_commands_single_write(self):
+        """Test several commands are coalesced into one port write."""
+        handler = SerialHandler(port="COM3", baudrate=9600)
+        port = Mock()
+        port.write.side_effect = len
+        handler.serial_conn = port
+        handler.is_connected = True
+        
+        assert handler.send_commands(["RESET", "START\n"])
+        port.write.assert_called_once_with(b'RESET\nSTART\n')
+        assert handler.stats['bytes_sent'] == 12
+        
+        assert handler.write_data("PING\n", defer=True)
+        assert port.write.call_count == 1
+        assert handler.flush()
+        port.write.assert_called_with(b'PING\n')
+        port.flush.assert_not_called()
+        
+        assert handler.send_command("EMERGENCY_STOP", flush=True)
+        port.flush.assert_called_once_with()
+
+    def test_async_protocol_lines(self):
+        """Test bytes received on the event loop are split into queued lines."""
+        async def scenario():
+            handler = SerialHandler(port="COM3", baudrate=9600)
+            handler.line_queue = asyncio.Queue()
+            protocol = _SerialProtocol(handler)
+            protocol.connection_made(Mock())
+            protocol.data_received(b'PONG\n{"denomination": 1')
+            protocol.data_received(b'.0}\n')
+            first = await handler.read_line(timeout=0.1)
+            second = await handler.read_line(timeout=0.1)
+            empty = await handler.read_line(timeout=0.01)
+            return handler, first, second, empty
+        
+        handler, first, second, empty = asyncio.run(scenario())
+        assert handler.is_connected
+        assert first == "PONG"
+        assert second == '{"denomination": 1.0}'
+        assert empty is None
+        assert handler.stats['bytes_received'] == 27
+
+    def test_low_latency_unsupported_port(self):
+        """Test ports without serial ioctls are left alone."""
+        port = Mock()
+        port.fileno.side_effect = AttributeError("fileno")
+        assert set_low_latency(port) is False
+        
+        with open(__file__, 'rb') as not_a_tty:
+            assert set_low_latency(not_a_tty) is False
+
+    def test_ring_buffer_wraparound(self):
+        """Test lines split across the end of the ring buffer are reassembled."""
+        ring = _RingBuffer(capacity=16)
+        ring.write(b'0123456789\n')
+        assert ring.readline() == b'0123456789'
+        
+        ring.write(b'abcdef')
+        assert ring.readline() is None
+        ring.write(b'ghij\nkl')
+        assert ring.readline() == b'abcdefghij'
+        assert ring.readline() is None
+        assert len(ring) == 2
+        
+        ring.write(b'x' * 20 + b'\n')
+        assert ring.readline() == b'x' * 15
+        
+        with pytest.raises(ValueError):
+            _RingBuffer(capacity=100)
+
 class TestDataParsing:
     """Test data parsing functionality."""
     
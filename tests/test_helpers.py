@@ -3,16 +3,11 @@ Unit tests for helper functions in BAR-COIN application.
 """
 
 import unittest
-import sys
-import os
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
-# Add the project root to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from bar_coin.utils.helpers import (
-    hash_password, verify_password, validate_username, validate_password,
+    hash_password, hash_passwords, verify_password, validate_username, validate_password,
     validate_email, calculate_total_value, calculate_total_coins,
     format_coin_counts, get_coin_statistics, format_duration,
     format_timestamp, generate_session_id, sanitize_filename,
@@ -44,7 +39,8 @@ class TestPasswordHelpers(unittest.TestCase):
     def test_verify_password(self):
         """Test password verification."""
         password = "testpassword123"
-        hashed = hash_password(password)
+        # The cost is read back from the hash, so the minimum keeps this fast
+        hashed = hash_password(password, rounds=4)
         
         # Test correct password
         self.assertTrue(verify_password(password, hashed))
@@ -55,6 +51,18 @@ class TestPasswordHelpers(unittest.TestCase):
         # Test empty password
         self.assertFalse(verify_password("", hashed))
     
+    def test_hash_passwords(self):
+        """Test batched hashing keeps order and produces verifiable hashes."""
+        passwords = ["first-pass1", "second-pass2", "third-pass3"]
+        hashes = hash_passwords(passwords, rounds=4)
+        
+        self.assertEqual(len(hashes), 3)
+        for password, hashed in zip(passwords, hashes):
+            self.assertTrue(hashed.startswith('$2b$04$'))
+            self.assertTrue(verify_password(password, hashed))
+        self.assertFalse(verify_password(passwords[0], hashes[1]))
+        self.assertEqual(hash_passwords([]), [])
+    
     def test_validate_password(self):
         """Test password validation."""
         # Test valid password
@@ -91,6 +99,7 @@ class TestValidationHelpers(unittest.TestCase):
         self.assertFalse(validate_username("a" * 21))  # Too long
         self.assertFalse(validate_username("user@name"))  # Invalid character
         self.assertFalse(validate_username("user name"))  # Space
+        self.assertFalse(validate_username("username\n"))  # Trailing newline
     
     def test_validate_email(self):
         """Test email validation."""
@@ -105,6 +114,7 @@ class TestValidationHelpers(unittest.TestCase):
         self.assertFalse(validate_email("@example.com"))  # No local part
         self.assertFalse(validate_email("user@"))  # No domain
         self.assertFalse(validate_email("user@.com"))  # No domain name
+        self.assertFalse(validate_email("test@example.com\n"))  # Trailing newline
 
 
 class TestCoinCalculationHelpers(unittest.TestCase):
@@ -209,6 +219,12 @@ class TestFormattingHelpers(unittest.TestCase):
         formatted = format_timestamp(test_time)
         self.assertIn("2023", formatted)
         self.assertIn("14:30", formatted)
+        
+        # Test ISO strings, unix seconds (UTC) and unparseable input
+        self.assertEqual(format_timestamp("2023-12-25T14:30:45Z"), "2023-12-25 14:30:45")
+        self.assertEqual(format_timestamp(1703514645), "2023-12-25 14:30:45")
+        self.assertEqual(format_timestamp("not a date"), "not a date")
+        self.assertEqual(format_timestamp(None), "None")
     
     def test_format_file_size(self):
         """Test file size formatting."""
@@ -345,6 +361,20 @@ class TestHardwareHelpers(unittest.TestCase):
             "timestamp": "2023-12-25T14:30:00"
         }
         self.assertFalse(validate_hardware_message(invalid_msg2))
+        
+        # Test float rounding error on a valid denomination
+        rounded_msg = {
+            "type": "coin",
+            "denomination": 0.7 - 0.6,
+            "timestamp": "2023-12-25T14:30:00"
+        }
+        self.assertTrue(validate_hardware_message(rounded_msg))
+        
+        # Test non-numeric denominations and malformed types
+        self.assertTrue(validate_hardware_message({"type": "coin_detected", "denomination": "0.25"}))
+        self.assertFalse(validate_hardware_message({"type": "coin", "denomination": "abc"}))
+        self.assertFalse(validate_hardware_message({"type": "coin", "denomination": None}))
+        self.assertFalse(validate_hardware_message({"type": ["coin"], "denomination": 5}))
     
     def test_calculate_processing_speed(self):
         """Test processing speed calculation."""